@@ -14,23 +14,157 @@ Usage:
 """
 
 import argparse
+import contextlib
+import hashlib
+import json
+import os
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # Add parent directory to path so idlgen package can be found
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import idlgen
 from idlgen import (
+    ParsedIDL,
     IDLParser,
     CAPIGenerator,
     ClientGenerator,
     WASMGenerator,
-    JNIGenerator,
-    PythonGenerator,
 )
 
 
+def _cached_parse(idl_path: Path, cache_dir: str) -> ParsedIDL:
+    """Parse an IDL file, reusing a cached result keyed by its content hash"""
+    # One read and one decode; the raw bytes feed the cache key directly
+    raw = idl_path.read_bytes()
+    data = raw.decode("utf-8")
+    if not cache_dir:
+        return IDLParser(data).parse()
+
+    h = hashlib.sha256(f"{idlgen.__version__}\0".encode())
+    # The cached JSON mirrors the parser's output, so its sources are part of the key
+    package_dir = Path(idlgen.__file__).parent
+    for source in ("parser.py", "types.py", "type_mapper.py"):
+        h.update((package_dir / source).read_bytes())
+    h.update(raw)
+    key = h.hexdigest()
+    cache_path = Path(cache_dir) / "parsed" / f"{key}.json"
+    try:
+        return ParsedIDL.from_dict(json.loads(cache_path.read_text()))
+    except (OSError, ValueError, KeyError, TypeError):
+        # Missing, unreadable or corrupt entry: parse again and rewrite it
+        pass
+
+    parsed = IDLParser(data).parse()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_text(cache_path, json.dumps(parsed.to_dict()))
+    return parsed
+
+
+def _atomic_write_text(path: Path, text: str):
+    """Write text via a temp file in the same directory so readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write content unless the file already holds it, keeping mtimes stable for build tools"""
+    try:
+        if path.read_text() == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    path.write_text(content)
+    return True
+
+
+class _OutputCache:
+    """Caches rendered output files keyed by parsed IDL, options and generator sources"""
+
+    def __init__(self, cache_dir: str, idl: ParsedIDL, *options: str):
+        self.dir = Path(cache_dir) / "out" if cache_dir else None
+        if self.dir is None:
+            return
+        h = hashlib.blake2b(digest_size=16)
+        # Any change to the generator sources invalidates every cached output
+        for source in sorted(Path(idlgen.__file__).parent.glob("*.py")):
+            h.update(source.read_bytes())
+        h.update(json.dumps([idl.to_dict(), options], sort_keys=True).encode())
+        self.base_key = h.hexdigest()
+
+    def get(self, name: str):
+        """Return the cached content for an output file, or None on a miss"""
+        if self.dir is None:
+            return None
+        # Missing or unreadable entries (e.g. removed by a concurrent cleanup) are misses
+        try:
+            digest, _, content = self._path(name).read_text().partition("\n")
+        except (OSError, UnicodeDecodeError):
+            return None
+        # Entries start with a digest of their content; anything else is corrupt
+        if digest != self._digest(content):
+            return None
+        return content
+
+    def put(self, name: str, content: str):
+        if self.dir is None:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # The cache directory may be shared by concurrent builds
+        _atomic_write_text(self._path(name), f"{self._digest(content)}\n{content}")
+
+    @staticmethod
+    def _digest(content: str) -> str:
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    def _path(self, name: str) -> Path:
+        return self.dir / hashlib.blake2b(f"{self.base_key}\0{name}".encode(), digest_size=16).hexdigest()
+
+
+def _call(render):
+    return render()
+
+
+def _render_all(files: dict, output_cache: _OutputCache, jobs: int) -> dict:
+    """Render every output not found in the cache, optionally across worker processes"""
+    contents = {}
+    pending = []
+    for path, render in files.items():
+        cached = output_cache.get(path.name)
+        if cached is None:
+            pending.append((path, render))
+        else:
+            contents[path] = cached
+
+    renders = [render for _, render in pending]
+    if jobs > 1 and len(renders) > 1:
+        # Imported lazily: multiprocessing dominates interpreter start-up otherwise
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            rendered = list(executor.map(_call, renders))
+    else:
+        rendered = [render() for render in renders]
+
+    for (path, _), content in zip(pending, rendered):
+        output_cache.put(path.name, content)
+        contents[path] = content
+
+    # Keep the declaration order of files
+    return {path: contents[path] for path in files}
+
+
 def main():
     start_time = time.perf_counter()
     
@@ -48,6 +182,12 @@ def main():
     parser.add_argument("--java-output", default="", help="Java source output directory (alternative)")
     parser.add_argument("--python", action="store_true", help="Generate Python bindings")
     parser.add_argument("--python-output", default="", help="Python bindings output directory")
+    parser.add_argument("--cache-dir", default=os.environ.get("IDLGEN_CACHE_DIR", ""),
+                        help="Directory for cached parse results and outputs (default: $IDLGEN_CACHE_DIR, disabled if unset)")
+    parser.add_argument("--header-only-client", action="store_true",
+                        help="Emit the C++ client as a single header with inline definitions (no .cpp)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Worker processes used to render outputs (0 = one per CPU)")
     args = parser.parse_args()
 
     # Support both positional and --idl argument
@@ -62,68 +202,87 @@ def main():
     # Extract just the filename from the header path
     impl_header = Path(impl_header).name
 
-    idl = IDLParser(idl_path.read_text()).parse()
+    idl = _cached_parse(idl_path, args.cache_dir)
 
     output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
     
     api_macro = args.api_macro or f"{namespace.upper()}_API"
 
     c_api = CAPIGenerator(idl, namespace, api_macro)
-    client = ClientGenerator(idl, namespace)
+    client = ClientGenerator(idl, namespace, emit_inline=args.header_only_client)
     wasm = WASMGenerator(idl, namespace)
 
+    # Output path -> renderer; rendering is deferred so cached outputs can skip it
     files = {
-        f"{namespace}_c_api.h": c_api.generate_header(),
-        f"{namespace}_c_api.cpp": c_api.generate_impl(impl_header),
-        f"{namespace}_client.hpp": client.generate_header(),
-        f"{namespace}_client.cpp": client.generate_impl(),
-        f"{namespace}_wasm_bindings.cpp": wasm.generate(impl_header),
+        output_dir / f"{namespace}_c_api.h": c_api.generate_header,
+        output_dir / f"{namespace}_c_api.cpp": partial(c_api.generate_impl, impl_header),
+        output_dir / f"{namespace}_client.hpp": client.generate_header,
     }
+    if not args.header_only_client:
+        files[output_dir / f"{namespace}_client.cpp"] = client.generate_impl
+    files[output_dir / f"{namespace}_wasm_bindings.cpp"] = partial(wasm.generate, impl_header)
 
     # Generate JNI bindings if requested (or if java-package/java-output is provided)
     java_output_dir = args.java_output_dir or args.java_output
     generate_java = args.java or args.java_package or java_output_dir
+    java_package = ""
     
     if generate_java:
+        from idlgen import JNIGenerator
+
         java_package = args.java_package or namespace.replace("_", ".")
         jni = JNIGenerator(idl, namespace, java_package)
         
-        files[f"{namespace}_jni.h"] = jni.generate_jni_header()
-        files[f"{namespace}_jni.cpp"] = jni.generate_jni_impl(impl_header)
+        files[output_dir / f"{namespace}_jni.h"] = jni.generate_jni_header
+        files[output_dir / f"{namespace}_jni.cpp"] = partial(jni.generate_jni_impl, impl_header)
         
         # Generate Java classes
         java_output = Path(java_output_dir) if java_output_dir else output_dir / "java"
         # Always add the package path subdirectory
         java_pkg_dir = java_output / java_package.replace(".", "/")
-        java_pkg_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate shared types file (structs and callbacks)
         if idl.structs or idl.callbacks:
-            types_path = java_pkg_dir / "Types.java"
-            types_path.write_text(jni.generate_java_types())
-            print(f"Generated: {types_path}")
+            files[java_pkg_dir / "Types.java"] = jni.generate_java_types
         
         for cls in idl.classes:
-            java_path = java_pkg_dir / f"{cls.name}.java"
-            java_path.write_text(jni.generate_java_class(cls))
-            print(f"Generated: {java_path}")
+            files[java_pkg_dir / f"{cls.name}.java"] = partial(jni.generate_java_class, cls)
 
     # Generate Python bindings if requested
     generate_python = args.python or args.python_output
     if generate_python:
+        from idlgen import PythonGenerator
+
         python_gen = PythonGenerator(idl, namespace)
         python_output = Path(args.python_output) if args.python_output else output_dir
-        python_output.mkdir(parents=True, exist_ok=True)
         
-        python_path = python_output / f"{namespace}.py"
-        python_path.write_text(python_gen.generate())
-        print(f"Generated: {python_path}")
-
-    for filename, content in files.items():
-        path = output_dir / filename
-        path.write_text(content)
-        print(f"Generated: {path}")
+        files[python_output / f"{namespace}.py"] = python_gen.generate
+
+    output_cache = _OutputCache(args.cache_dir, idl, namespace, impl_header, api_macro, java_package,
+                                str(args.header_only_client))
+
+    jobs = args.jobs or os.cpu_count() or 1
+    contents = _render_all(files, output_cache, jobs)
+
+    # Create every output directory in one pass before the concurrent writes
+    for directory in {path.parent for path in contents}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    # Writes are I/O bound, so overlap them on threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        written = list(executor.map(_write_if_changed, contents.keys(), contents.values()))
+
+    # One buffered write instead of a flush per generated file
+    sys.stdout.write("".join(
+        f"{'Generated' if changed else 'Unchanged'}: {path}\n"
+        for path, changed in zip(contents, written)
+    ))
+
+    # A client .cpp left by an earlier run would redefine the header's inline functions
+    stale_client_impl = output_dir / f"{namespace}_client.cpp"
+    if args.header_only_client and stale_client_impl.exists():
+        stale_client_impl.unlink()
+        print(f"Removed: {stale_client_impl}")
 
     elapsed = time.perf_counter() - start_time
     print(f"Generation completed in {elapsed*1000:.2f} ms")
@@ -9,14 +9,32 @@ Parses C++-like IDL definitions and generates:
   5. Python bindings using ctypes
 """
 
+__version__ = "1.0.0"
+
+from importlib import import_module
+
 from .types import Param, Member, Method, Class, Struct, Enum, EnumValue, ParsedIDL
 from .parser import IDLParser
 from .type_mapper import TypeMapper
-from .c_api_generator import CAPIGenerator
-from .client_generator import ClientGenerator
-from .wasm_generator import WASMGenerator
-from .jni_generator import JNIGenerator
-from .python_generator import PythonGenerator
+
+# Generator backends are imported on first access (PEP 562) so a run only
+# pays for the generators it actually uses.
+_LAZY_GENERATORS = {
+    'CAPIGenerator': '.c_api_generator',
+    'ClientGenerator': '.client_generator',
+    'WASMGenerator': '.wasm_generator',
+    'JNIGenerator': '.jni_generator',
+    'PythonGenerator': '.python_generator',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_GENERATORS:
+        value = getattr(import_module(_LAZY_GENERATORS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'Param', 'Member', 'Method', 'Class', 'Struct', 'ParsedIDL',
@@ -1,9 +1,121 @@
 """C API Generator - generates C header and implementation for shared library export"""
 
+import sys
+from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
 from .types import ParsedIDL, Class, Method, Member, Param
 from .type_mapper import TypeMapper
 
+_EXTERN_C_OPEN = 'extern "C" {'
+_EXTERN_C_CLOSE = '} // extern "C"'
+
+# Error return value for C return types that are not pointers
+_NULL_RET = {"int": "-1", "bool": "0", "double": "0", "float": "0"}
+
+# Constructor/destructor pair; the trailing newline stands in for the blank separator line
+_CTOR_TPL = (
+    "{h}* {prefix}_create({c_params}) {{\n"
+    "{null_checks}"
+    "    try {{\n"
+    "        auto handle = new {h}();\n"
+    "        handle->impl = std::make_unique<{cpp_class}>({cpp_args});\n"
+    "        return handle;\n"
+    "    }} catch (...) {{ return nullptr; }}\n"
+    "}}\n"
+    "\n"
+    "void {prefix}_destroy({h}* handle) {{\n"
+    "    delete handle;\n"
+    "}}\n"
+)
+
+# Opaque handle wrapping the C++ object; {extra} holds optional member lines
+_HANDLE_STRUCT_TPL = (
+    "struct {h} {{\n"
+    "    std::unique_ptr<{cpp_class}> impl;\n"
+    "{extra}"
+    "}};\n"
+)
+
+# Result struct plus its accessors, one pair per unique vector element type
+_RESULT_STRUCT_TPL = (
+    "struct {rn} {{\n"
+    "    std::vector<{cpp_inner}> data;\n"
+    "}};\n"
+)
+
+_RESULT_ACCESSORS_TPL = (
+    "int {rn}_getCount(const {rn}* result) {{\n"
+    "    return result ? static_cast<int>(result->data.size()) : -1;\n"
+    "}}\n"
+    "\n"
+    "const {inner}* {rn}_getData(const {rn}* result) {{\n"
+    "    return (result && !result->data.empty()) ? result->data.data() : nullptr;\n"
+    "}}\n"
+    "\n"
+    "void {rn}_free({rn}* result) {{\n"
+    "    delete result;\n"
+    "}}\n"
+)
+
+_RESULT_ACCESSOR_DECLS_TPL = (
+    "{c.api_macro} int {rn}_getCount(const {rn}* result);\n"
+    "{c.api_macro} const {inner}* {rn}_getData(const {rn}* result);\n"
+    "{c.api_macro} void {rn}_free({rn}* result);"
+)
+
+# Attribute getters; the C++ accessor shares the C getter's name
+_ATTR_GETTER_DECL_TPL = "{c.api_macro} {ret} {c.prefix}_{getter}({c.handle}* handle);"
+
+_ATTR_GETTER_IMPL_TPL = (
+    "{ret} {c.prefix}_{getter}({c.handle}* handle) {{\n"
+    "    return (handle && handle->impl) ? handle->impl->{getter}() : 0;\n"
+    "}}\n"
+)
+
+# Per-class names shared by every declaration/definition emitted for that class
+_ClassCtx = namedtuple("_ClassCtx", "handle cpp_class prefix api_macro")
+
+# Per-method strings shared by the declaration and the definition of its C function
+_MethodInfo = namedtuple("_MethodInfo", "c_ret c_params cpp_args string_params null_ret")
+
+
+def _write_lines(path, lines: list[str]):
+    """Write newline-separated lines through a large buffer, without joining them first"""
+    with open(path, "w", buffering=1 << 20) as f:
+        write = f.write
+        it = iter(lines)
+        write(next(it, ""))
+        for line in it:
+            write("\n")
+            write(line)
+
+
+def _value_param_to_c(param: Param) -> str:
+    base = TypeMapper.to_c(param.type)
+    if param.is_const:
+        base = f'const {base}'
+    if param.is_pointer:
+        return f'{base}* {param.name}'
+    return f'{base} {param.name}'
+
+
+def _class_param_to_c(param: Param) -> str:
+    # Class types use Handle pointers
+    const = 'const ' if param.is_const else ''
+    return f'{const}{param.type}Handle* {param.name}'
+
+
+# C parameter declaration per parameter kind (see CAPIGenerator._param_kind)
+_PARAM_FORMATTERS = {
+    'string': lambda p: f'const char* {p.name}',
+    # Callback types are already function pointers
+    'callback': lambda p: f'{p.type} {p.name}',
+    'class': _class_param_to_c,
+    'struct': _value_param_to_c,
+    'value': _value_param_to_c,
+}
+
 
 class CAPIGenerator:
     """Generates C API header and implementation"""
@@ -11,20 +123,75 @@ class CAPIGenerator:
     def __init__(self, idl: ParsedIDL, namespace: str, api_macro: str = ""):
         self.idl = idl
         self.namespace = namespace
-        self.api_macro = api_macro or f"{namespace.upper()}_API"
-        self.export_macro = f"{namespace.upper()}_EXPORTS"
+        self._ns_upper = namespace.upper()
+        self._guard = f"{self._ns_upper}_C_API_H"
+        # Identifiers repeated throughout the output are interned so their copies share storage
+        self.api_macro = sys.intern(api_macro or f"{self._ns_upper}_API")
+        self.export_macro = sys.intern(f"{self._ns_upper}_EXPORTS")
+
+        # Name lookups used for every parameter and return type
+        self._class_names = {c.name for c in idl.classes}
+        self._struct_names = {s.name for s in idl.structs}
+        self._enum_names = {e.name for e in idl.enums}
+        self._callbacks = {cb.name: cb for cb in idl.callbacks}
+        self._wrapped_callbacks: dict[str, bool] = {}
+        # Handle/C++ class names per class, built once and shared by every emitter
+        self._class_ctxs = {
+            c.name: _ClassCtx(
+                handle=sys.intern(f"{c.name}Handle"),
+                cpp_class=sys.intern(f"{namespace}::{c.name}"),
+                prefix=c.name,
+                api_macro=self.api_macro,
+            )
+            for c in idl.classes
+        }
+        self._param_kinds: dict[str, str] = {}
+        self._method_infos: dict[str, tuple[_MethodInfo, ...]] = {}
+        # Fixed header text depends only on the options above, so build it once
+        self._preamble = "\n".join(self._header_preamble())
+        self._postamble = "\n".join(self._header_postamble())
+        # Rendered output; the IDL and options are fixed after construction
+        self._header: str | None = None
+        self._impls: dict[str, str] = {}
 
     def generate_header(self) -> str:
-        lines = self._header_preamble()
-        lines.extend(self._generate_enums())
-        lines.extend(self._generate_structs())
-        lines.extend(self._generate_callbacks())
-        lines.extend(self._generate_class_decls())
-        lines.extend(self._header_postamble())
-        return "\n".join(lines)
+        if self._header is None:
+            self._header = "\n".join(self._header_lines())
+        return self._header
 
     def generate_impl(self, impl_header: str) -> str:
-        lines = [
+        impl = self._impls.get(impl_header)
+        if impl is None:
+            impl = self._impls[impl_header] = "\n".join(self._impl_lines(impl_header))
+        return impl
+
+    def generate_header_to(self, path):
+        """Write the header to path, streaming lines unless it is already rendered"""
+        if self._header is not None:
+            Path(path).write_text(self._header)
+        else:
+            _write_lines(path, self._header_lines())
+
+    def generate_impl_to(self, path, impl_header: str):
+        """Write the implementation to path, streaming lines unless it is already rendered"""
+        impl = self._impls.get(impl_header)
+        if impl is not None:
+            Path(path).write_text(impl)
+        else:
+            _write_lines(path, self._impl_lines(impl_header))
+
+    def _header_lines(self) -> list[str]:
+        # Every emitter appends to this one list, joined once at the end
+        out: list[str] = [self._preamble]
+        self._generate_enums(out)
+        self._generate_structs(out)
+        self._generate_callbacks(out)
+        self._generate_class_decls(out)
+        out.append(self._postamble)
+        return out
+
+    def _impl_lines(self, impl_header: str) -> list[str]:
+        out = [
             "// AUTO-GENERATED - DO NOT EDIT",
             f'#include "{Path(impl_header).name}"',
             f'#include "{self.namespace}_c_api.h"',
@@ -33,12 +200,12 @@ class CAPIGenerator:
             "",
         ]
         for cls in self.idl.classes:
-            lines.extend(self._generate_class_impl(cls))
-        return "\n".join(lines)
+            self._generate_class_impl(cls, out)
+        return out
 
-    def _header_preamble(self) -> list[str]:
-        guard = f"{self.namespace.upper()}_C_API_H"
-        return [
+    def _header_preamble(self) -> tuple[str, ...]:
+        guard = self._guard
+        return (
             "// AUTO-GENERATED - DO NOT EDIT",
             f"#ifndef {guard}",
             f"#define {guard}",
@@ -46,7 +213,7 @@ class CAPIGenerator:
             "#include <stdint.h>",
             "",
             "#ifdef __cplusplus",
-            'extern "C" {',
+            _EXTERN_C_OPEN,
             "#endif",
             "",
             "#ifdef _WIN32",
@@ -59,47 +226,42 @@ class CAPIGenerator:
             f'    #define {self.api_macro} __attribute__((visibility("default")))',
             "#endif",
             "",
-        ]
+        )
 
-    def _header_postamble(self) -> list[str]:
-        return [
+    def _header_postamble(self) -> tuple[str, ...]:
+        return (
             "#ifdef __cplusplus",
             "}",
             "#endif",
             "",
-            f"#endif // {self.namespace.upper()}_C_API_H",
-        ]
+            f"#endif // {self._guard}",
+        )
 
-    def _generate_enums(self) -> list[str]:
+    def _generate_enums(self, out: list[str]):
         """Generate enum type definitions"""
-        lines = []
+        append = out.append
         for enum in self.idl.enums:
-            lines.append(f"typedef enum {enum.name} {{")
+            append(f"typedef enum {enum.name} {{")
+            last = len(enum.values) - 1
             for i, val in enumerate(enum.values):
-                comma = "," if i < len(enum.values) - 1 else ""
+                comma = "," if i < last else ""
                 if val.value is not None:
-                    lines.append(f"    {enum.name}_{val.name} = {val.value}{comma}")
+                    append(f"    {enum.name}_{val.name} = {val.value}{comma}")
                 else:
-                    lines.append(f"    {enum.name}_{val.name}{comma}")
-            lines.append(f"}} {enum.name};")
-            lines.append("")
-        return lines
+                    append(f"    {enum.name}_{val.name}{comma}")
+            out.extend((f"}} {enum.name};", ""))
 
-    def _generate_structs(self) -> list[str]:
-        lines = []
+    def _generate_structs(self, out: list[str]):
         for d in self.idl.structs:
-            lines.append(f"typedef struct {d.name} {{")
-            for m in d.members:
-                lines.append(f"    {TypeMapper.to_c(m.type)} {m.name};")
-            lines.append(f"}} {d.name};")
-            lines.append("")
-        return lines
+            out.append(f"typedef struct {d.name} {{")
+            out.extend(f"    {TypeMapper.to_c(m.type)} {m.name};" for m in d.members)
+            out.extend((f"}} {d.name};", ""))
 
     def _callback_param_to_c(self, param: Param) -> str:
         """Convert callback parameter to C type"""
         base = TypeMapper.to_c(param.type)
         # Struct references become const pointers in C callbacks
-        if param.is_reference and self._is_struct_type(param.type):
+        if param.is_reference and self._param_kind(param.type) == 'struct':
             if param.is_const:
                 return f"const {base}*"
             return f"{base}*"
@@ -109,268 +271,251 @@ class CAPIGenerator:
             return f"{base}*"
         return base
 
-    def _generate_callbacks(self) -> list[str]:
+    def _generate_callbacks(self, out: list[str]):
         """Generate callback function pointer typedefs"""
-        lines = []
         for cb in self.idl.callbacks:
             params = ", ".join(self._callback_param_to_c(p) for p in cb.params) or "void"
             ret = TypeMapper.to_c(cb.return_type)
-            lines.append(f"typedef {ret} (*{cb.name})({params});")
+            out.append(f"typedef {ret} (*{cb.name})({params});")
         if self.idl.callbacks:
-            lines.append("")
-        return lines
+            out.append("")
 
-    def _generate_class_decls(self) -> list[str]:
-        lines = []
+    def _generate_class_decls(self, out: list[str]):
         for cls in self.idl.classes:
-            handle = f"{cls.name}Handle"
+            self._generate_class_decl(cls, out)
 
-            lines.append(f"typedef struct {handle} {handle};")
-            
-            # Create result struct typedef per unique vector return type
-            vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-            result_types = set()
-            for m in vec_methods:
-                inner = TypeMapper.vector_inner(m.return_type)
-                result_types.add(inner)
-            
-            for inner in sorted(result_types):
-                result_name = self._result_struct_name(cls.name, inner)
-                lines.append(f"typedef struct {result_name} {result_name};")
-            
-            lines.append("")
+    def _generate_class_decl(self, cls: Class, out: list[str]):
+        ctx = self._class_ctx(cls)
 
-            for method in cls.methods:
-                lines.extend(self._method_decl(cls, method))
+        out.append(f"typedef struct {ctx.handle} {ctx.handle};")
+        
+        # Create result struct typedef per unique vector return type
+        result_types = cls.vector_inners
+        for inner in result_types:
+            result_name = self._result_struct_name(ctx.prefix, inner)
+            out.append(f"typedef struct {result_name} {result_name};")
+        
+        out.append("")
+
+        for method, info in zip(cls.methods, self._class_method_infos(ctx, cls)):
+            self._method_decl(ctx, method, info, out)
+
+        # Result accessors per unique vector element type
+        out.extend(
+            _RESULT_ACCESSOR_DECLS_TPL.format(c=ctx, rn=self._result_struct_name(ctx.prefix, inner), inner=inner)
+            for inner in result_types
+        )
 
-            # Result accessors per unique vector element type
-            for inner in sorted(result_types):
-                result_name = self._result_struct_name(cls.name, inner)
-                lines.append(f"{self.api_macro} int {result_name}_getCount(const {result_name}* result);")
-                lines.append(f"{self.api_macro} const {inner}* {result_name}_getData(const {result_name}* result);")
-                lines.append(f"{self.api_macro} void {result_name}_free({result_name}* result);")
+        out.extend(self._attr_getter_decl(ctx, member) for member in cls.members)
 
-            for member in cls.members:
-                lines.append(self._attr_getter_decl(cls, member))
+        out.append("")
 
-            lines.append("")
-        return lines
+    def _class_ctx(self, cls: Class) -> _ClassCtx:
+        return self._class_ctxs[cls.name]
 
-    def _result_struct_name(self, class_name: str, inner_type: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _result_struct_name(class_name: str, inner_type: str) -> str:
         """Generate a unique result struct name for class + element type.
         Uses underscores and _C suffix to avoid collisions with client wrapper classes."""
         return f"{class_name}_{inner_type}_CResult"
 
-    def _method_decl(self, cls: Class, method: Method) -> list[str]:
-        h = f"{cls.name}Handle"
-        prefix = cls.name
-        lines = []
-
+    def _class_method_infos(self, ctx: _ClassCtx, cls: Class) -> tuple[_MethodInfo, ...]:
+        """Per-method analysis, aligned with cls.methods and computed once per class"""
+        infos = self._method_infos.get(cls.name)
+        if infos is None:
+            infos = tuple(self._method_info(ctx, m) for m in cls.methods)
+            self._method_infos[cls.name] = infos
+        return infos
+
+    def _method_info(self, ctx: _ClassCtx, method: Method) -> _MethodInfo:
+        """Everything the C declaration and definition of a method need, except its body"""
+        params = method.params
+        string_params = tuple(p.name for p in params if TypeMapper.is_string(p.type))
         if method.is_constructor:
-            c_params = self._c_params_str(method.params)
-            lines.append(f"{self.api_macro} {h}* {prefix}_create({c_params});")
-            lines.append(f"{self.api_macro} void {prefix}_destroy({h}* handle);")
+            return _MethodInfo(
+                c_ret=f"{ctx.handle}*",
+                c_params=self._c_params_str(params),
+                cpp_args=", ".join(p.name for p in params),
+                string_params=string_params,
+                null_ret="nullptr",
+            )
         else:
-            ret = self._c_return_type_for_method(cls.name, method.return_type)
-            params = [f"{h}* handle"] + [self._param_to_c(p) for p in method.params]
-            lines.append(f"{self.api_macro} {ret} {prefix}_{method.name}({', '.join(params)});")
+            ret = self._c_return_type_for_method(ctx.prefix, method.return_type)
+            # Determine appropriate null/error return value; structs return empty
+            if ret.endswith("*"):
+                null_ret = "nullptr"
+            else:
+                null_ret = _NULL_RET.get(ret) or ("0" if TypeMapper.is_primitive(method.return_type) else "{}")
+            return _MethodInfo(
+                c_ret=ret,
+                c_params=", ".join([f"{ctx.handle}* handle"] + [self._param_to_c(p) for p in params]),
+                cpp_args=self._build_cpp_args(params),
+                string_params=string_params,
+                null_ret=null_ret,
+            )
+
+    def _method_decl(self, ctx: _ClassCtx, method: Method, info: _MethodInfo, out: list[str]):
+        h = ctx.handle
+        prefix = ctx.prefix
+        api = ctx.api_macro
 
-        return lines
+        if method.is_constructor:
+            out.extend((
+                f"{api} {h}* {prefix}_create({info.c_params});",
+                f"{api} void {prefix}_destroy({h}* handle);",
+            ))
+            return
+
+        out.append(f"{api} {info.c_ret} {prefix}_{method.name}({info.c_params});")
 
-    def _attr_getter_decl(self, cls: Class, member: Member) -> str:
-        h = f"{cls.name}Handle"
+    def _attr_getter_decl(self, ctx: _ClassCtx, member: Member) -> str:
         ret = "int" if member.type == "bool" else TypeMapper.to_c(member.type)
-        getter = self._getter_name(member)
-        return f"{self.api_macro} {ret} {cls.name}_{getter}({h}* handle);"
+        return _ATTR_GETTER_DECL_TPL.format(c=ctx, ret=ret, getter=self._getter_name(member.name, member.type))
 
-    def _generate_class_impl(self, cls: Class) -> list[str]:
-        h = f"{cls.name}Handle"
-        cpp_class = f"{self.namespace}::{cls.name}"
-        lines = []
+    def _generate_class_impl(self, cls: Class, out: list[str]):
+        ctx = self._class_ctx(cls)
+        h = ctx.handle
 
-        # Check if any method returns string
-        has_string_return = any(m.return_type == "string" for m in cls.methods if not m.is_constructor)
+        # Classify every method's return once; the string check falls out of the same pass
+        return_kinds = [self._return_kind(m) for m in cls.methods]
+        has_string_return = "string" in return_kinds
 
-        # Handle struct
-        lines.append(f"struct {h} {{")
-        lines.append(f"    std::unique_ptr<{cpp_class}> impl;")
-        if has_string_return:
-            lines.append("    std::string last_string;")
-        lines.append("};")
-        lines.append("")
+        out.append(_HANDLE_STRUCT_TPL.format(
+            h=h,
+            cpp_class=ctx.cpp_class,
+            extra="    std::string last_string;\n" if has_string_return else "",
+        ))
 
         # Result struct per unique vector element type
-        vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-        result_types = set()
-        for m in vec_methods:
-            inner = TypeMapper.vector_inner(m.return_type)
-            result_types.add(inner)
-        
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            cpp_inner = TypeMapper.to_cpp(inner)
-            lines.append(f"struct {result_name} {{")
-            lines.append(f"    std::vector<{cpp_inner}> data;")
-            lines.append("};")
-            lines.append("")
+        result_types = cls.vector_inners
+        for inner in result_types:
+            out.append(_RESULT_STRUCT_TPL.format(
+                rn=self._result_struct_name(ctx.prefix, inner),
+                cpp_inner=TypeMapper.to_cpp(inner),
+            ))
 
-        lines.append('extern "C" {')
-        lines.append("")
+        out.append(_EXTERN_C_OPEN)
+        out.append("")
 
-        for method in cls.methods:
-            lines.extend(self._method_impl(cls, method, cpp_class))
+        infos = self._class_method_infos(ctx, cls)
+        for method, info, kind in zip(cls.methods, infos, return_kinds):
+            self._method_impl(ctx, method, info, out, kind=kind)
 
         # Result accessors per unique vector element type
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            lines.extend([
-                f"int {result_name}_getCount(const {result_name}* result) {{",
-                "    return result ? static_cast<int>(result->data.size()) : -1;",
-                "}",
-                "",
-                f"const {inner}* {result_name}_getData(const {result_name}* result) {{",
-                "    return (result && !result->data.empty()) ? result->data.data() : nullptr;",
-                "}",
-                "",
-                f"void {result_name}_free({result_name}* result) {{",
-                "    delete result;",
-                "}",
-                "",
-            ])
+        out.extend(
+            _RESULT_ACCESSORS_TPL.format(rn=self._result_struct_name(ctx.prefix, inner), inner=inner)
+            for inner in result_types
+        )
 
         for member in cls.members:
-            lines.extend(self._attr_getter_impl(cls, member))
+            self._attr_getter_impl(ctx, member, out)
 
-        lines.append("} // extern \"C\"")
-        lines.append("")
-        return lines
-
-    def _method_impl(self, cls: Class, method: Method, cpp_class: str) -> list[str]:
-        h = f"{cls.name}Handle"
-        prefix = cls.name
-        lines = []
+        out.append(_EXTERN_C_CLOSE)
+        out.append("")
 
+    def _return_kind(self, method: Method) -> str:
+        """Classify how a method's result is returned through the C API"""
         if method.is_constructor:
-            c_params = self._c_params_str(method.params)
-            lines.append(f"{h}* {prefix}_create({c_params}) {{")
-
-            for p in method.params:
-                if TypeMapper.is_string(p.type):
-                    lines.append(f"    if (!{p.name}) return nullptr;")
-
-            lines.append("    try {")
-            lines.append(f"        auto handle = new {h}();")
-            cpp_args = ", ".join(p.name for p in method.params)
-            lines.append(f"        handle->impl = std::make_unique<{cpp_class}>({cpp_args});")
-            lines.append("        return handle;")
-            lines.append("    } catch (...) { return nullptr; }")
-            lines.append("}")
-            lines.append("")
-
-            lines.append(f"void {prefix}_destroy({h}* handle) {{")
-            lines.append("    delete handle;")
-            lines.append("}")
-            lines.append("")
+            return "constructor"
+        if TypeMapper.is_vector(method.return_type):
+            return "vector"
+        if method.return_type == "string":
+            return "string"
+        if method.return_type.endswith('*') and self._is_class_type(method.return_type):
+            return "class_pointer"
+        return "value"
+
+    def _method_impl(self, ctx: _ClassCtx, method: Method, info: _MethodInfo, out: list[str], kind: str = ""):
+        h = ctx.handle
+        prefix = ctx.prefix
+        kind = kind or self._return_kind(method)
+
+        if kind == "constructor":
+            out.append(_CTOR_TPL.format_map({
+                "h": h,
+                "prefix": prefix,
+                "cpp_class": ctx.cpp_class,
+                "c_params": info.c_params,
+                "cpp_args": info.cpp_args,
+                "null_checks": "".join(f"    if (!{name}) return nullptr;\n" for name in info.string_params),
+            }))
         else:
-            ret = self._c_return_type_for_method(cls.name, method.return_type)
-            params = [f"{h}* handle"] + [self._param_to_c(p) for p in method.params]
-
-            lines.append(f"{ret} {prefix}_{method.name}({', '.join(params)}) {{")
+            out.append(f"{info.c_ret} {prefix}_{method.name}({info.c_params}) {{")
 
             null_checks = ["!handle", "!handle->impl"]
-            for p in method.params:
-                if TypeMapper.is_string(p.type):
-                    null_checks.append(f"!{p.name}")
-
-            # Determine appropriate null/error return value
-            if ret.endswith("*"):
-                null_ret = "nullptr"
-            elif ret == "int":
-                null_ret = "-1"
-            elif ret in ("bool", "double", "float"):
-                null_ret = "0"
-            elif TypeMapper.is_primitive(method.return_type):
-                null_ret = "0"
-            else:
-                # Struct type - return empty struct
-                null_ret = "{}"
-            lines.append(f"    if ({' || '.join(null_checks)}) return {null_ret};")
+            null_checks.extend(f"!{name}" for name in info.string_params)
+            out.append(f"    if ({' || '.join(null_checks)}) return {info.null_ret};")
 
-            # Convert parameters for C++ call
-            cpp_args = self._build_cpp_args(method.params)
+            cpp_args = info.cpp_args
             
-            if TypeMapper.is_vector(method.return_type):
+            if kind == "vector":
                 inner = TypeMapper.vector_inner(method.return_type)
-                result_name = self._result_struct_name(cls.name, inner)
-                lines.append(f"    auto result = new {result_name}();")
-                lines.append(f"    result->data = handle->impl->{method.name}({cpp_args});")
-                lines.append("    return result;")
-            elif method.return_type == "string":
+                result_name = self._result_struct_name(prefix, inner)
+                out.extend((
+                    f"    auto result = new {result_name}();",
+                    f"    result->data = handle->impl->{method.name}({cpp_args});",
+                    "    return result;",
+                ))
+            elif kind == "string":
                 # Store string in handle to keep it alive
-                lines.append(f"    handle->last_string = handle->impl->{method.name}({cpp_args});")
-                lines.append("    return handle->last_string.c_str();")
-            elif method.return_type.endswith('*'):
-                # Pointer return - check if it's a class type
-                base_type = method.return_type.rstrip('*').strip()
-                if self._is_class_type(base_type):
-                    # Wrap returned class pointer in a handle
-                    handle_type = f"{base_type}Handle"
-                    lines.append(f"    auto* obj = handle->impl->{method.name}({cpp_args});")
-                    lines.append(f"    if (!obj) return nullptr;")
-                    lines.append(f"    auto* result = new {handle_type}();")
-                    lines.append(f"    result->impl = std::unique_ptr<{self.namespace}::{base_type}>(obj);")
-                    lines.append("    return result;")
-                else:
-                    lines.append(f"    return handle->impl->{method.name}({cpp_args});")
+                out.extend((
+                    f"    handle->last_string = handle->impl->{method.name}({cpp_args});",
+                    "    return handle->last_string.c_str();",
+                ))
+            elif kind == "class_pointer":
+                # Wrap returned class pointer in a handle
+                target = self._class_ctxs[method.return_type.rstrip('*').strip()]
+                out.extend((
+                    f"    auto* obj = handle->impl->{method.name}({cpp_args});",
+                    "    if (!obj) return nullptr;",
+                    f"    auto* result = new {target.handle}();",
+                    f"    result->impl = std::unique_ptr<{target.cpp_class}>(obj);",
+                    "    return result;",
+                ))
             else:
-                lines.append(f"    return handle->impl->{method.name}({cpp_args});")
-
-            lines.append("}")
-            lines.append("")
+                out.append(f"    return handle->impl->{method.name}({cpp_args});")
 
-        return lines
+            out.extend(("}", ""))
 
     def _get_callback(self, type_name: str):
         """Get callback definition by name"""
-        return next((cb for cb in self.idl.callbacks if cb.name == type_name), None)
-
-    def _needs_callback_wrapper(self, cb) -> bool:
-        """Check if callback needs a wrapper (has struct reference params)"""
-        for p in cb.params:
-            if self._is_struct_type(p.type) and p.is_reference:
-                return True
-        return False
+        return self._callbacks.get(type_name)
+
+    def _needs_callback_wrapper(self, cb_name: str) -> bool:
+        """Check if callback needs a wrapper (has struct reference params), once per callback"""
+        needs = self._wrapped_callbacks.get(cb_name)
+        if needs is None:
+            needs = any(
+                p.is_reference and p.type in self._struct_names
+                for p in self._callbacks[cb_name].params
+            )
+            self._wrapped_callbacks[cb_name] = needs
+        return needs
 
     def _build_cpp_args(self, params: list[Param]) -> str:
         """Build C++ argument list, converting handles to impl pointers"""
-        args = []
-        for p in params:
-            if self._is_callback_type(p.type):
-                # Check if callback needs wrapper
-                cb = self._get_callback(p.type)
-                if cb and self._needs_callback_wrapper(cb):
-                    # Generate inline lambda wrapper
-                    wrapper = self._generate_callback_wrapper_inline(p.name, cb)
-                    args.append(wrapper)
-                else:
-                    args.append(p.name)
-            elif self._is_class_type(p.type):
-                # Handle pointer -> impl pointer or reference
-                if p.is_reference:
-                    # Reference parameter - dereference impl pointer
-                    args.append(f"*{p.name}->impl")
-                elif p.is_pointer:
-                    # Pointer parameter - get raw impl pointer
-                    args.append(f"({p.name} && {p.name}->impl) ? {p.name}->impl.get() : nullptr")
-                else:
-                    # By value (unlikely for classes) - dereference
-                    args.append(f"*{p.name}->impl")
-            elif self._is_struct_type(p.type) and p.is_reference:
-                # Struct reference - dereference pointer if needed
-                args.append(f"*{p.name}" if p.is_pointer else p.name)
-            else:
-                args.append(p.name)
-        return ", ".join(args)
+        return ", ".join(self._convert_one_arg(p) for p in params)
+
+    def _convert_one_arg(self, p: Param) -> str:
+        """Convert a single C argument into the expression passed to the C++ call"""
+        kind = self._param_kind(p.type)
+        if kind == 'callback':
+            # Callbacks with struct reference params go through an inline lambda wrapper
+            if self._needs_callback_wrapper(p.type):
+                return self._generate_callback_wrapper_inline(p.name, self._get_callback(p.type))
+            return p.name
+        if kind == 'class':
+            # Handle pointer -> impl pointer or reference
+            if p.is_pointer and not p.is_reference:
+                # Pointer parameter - get raw impl pointer
+                return f"({p.name} && {p.name}->impl) ? {p.name}->impl.get() : nullptr"
+            # Reference (or by-value) parameter - dereference impl pointer
+            return f"*{p.name}->impl"
+        if kind == 'struct' and p.is_reference:
+            # Struct reference - dereference pointer if needed
+            return f"*{p.name}" if p.is_pointer else p.name
+        return p.name
 
     def _generate_callback_wrapper_inline(self, name: str, cb) -> str:
         """Generate an inline lambda wrapper for callbacks with struct references"""
@@ -399,69 +544,56 @@ class CAPIGenerator:
         else:
             return f"[{name}]({cpp_params_str}) {{ return {name}({c_call_args_str}); }}"
 
-    def _attr_getter_impl(self, cls: Class, member: Member) -> list[str]:
-        h = f"{cls.name}Handle"
+    def _attr_getter_impl(self, ctx: _ClassCtx, member: Member, out: list[str]):
         ret = "int" if member.type == "bool" else TypeMapper.to_c(member.type)
-        getter = self._getter_name(member)
-        cpp_getter = f"is{member.name[0].upper()}{member.name[1:]}" if member.type == "bool" else f"get{member.name[0].upper()}{member.name[1:]}"
-
-        return [
-            f"{ret} {cls.name}_{getter}({h}* handle) {{",
-            f"    return (handle && handle->impl) ? handle->impl->{cpp_getter}() : 0;",
-            "}",
-            "",
-        ]
+        out.append(_ATTR_GETTER_IMPL_TPL.format(c=ctx, ret=ret, getter=self._getter_name(member.name, member.type)))
 
     def _is_callback_type(self, type_name: str) -> bool:
         """Check if type is a callback"""
-        return any(cb.name == type_name for cb in self.idl.callbacks)
+        return type_name in self._callbacks
 
     def _is_class_type(self, type_name: str) -> bool:
         """Check if type is a class defined in IDL"""
         # Strip pointer suffix if present
-        clean_type = type_name.rstrip('*').strip()
-        return any(c.name == clean_type for c in self.idl.classes)
+        return type_name.rstrip('*').strip() in self._class_names
 
     def _is_struct_type(self, type_name: str) -> bool:
         """Check if type is a struct defined in IDL"""
-        return any(s.name == type_name for s in self.idl.structs)
+        return type_name in self._struct_names
 
     def _is_enum_type(self, type_name: str) -> bool:
         """Check if type is an enum defined in IDL"""
-        return any(e.name == type_name for e in self.idl.enums)
+        return type_name in self._enum_names
+
+    def _param_kind(self, type_name: str) -> str:
+        """Classify a parameter type once: string, callback, class, struct or value"""
+        kind = self._param_kinds.get(type_name)
+        if kind is None:
+            if type_name == 'string':
+                kind = 'string'
+            elif type_name in self._callbacks:
+                kind = 'callback'
+            elif self._is_class_type(type_name):
+                kind = 'class'
+            elif type_name in self._struct_names:
+                kind = 'struct'
+            else:
+                kind = 'value'
+            self._param_kinds[type_name] = kind
+        return kind
 
     def _param_to_c(self, param: Param) -> str:
         """Convert param to C declaration"""
-        if param.type == 'string':
-            return f'const char* {param.name}'
-        
-        # Callback types are already function pointers
-        if self._is_callback_type(param.type):
-            return f'{param.type} {param.name}'
-        
-        # Class types use Handle pointers
-        if self._is_class_type(param.type):
-            handle = f"{param.type}Handle"
-            if param.is_const:
-                return f'const {handle}* {param.name}'
-            return f'{handle}* {param.name}'
-        
-        base = TypeMapper.to_c(param.type)
-        if param.is_const:
-            base = f'const {base}'
-        if param.is_pointer:
-            return f'{base}* {param.name}'
-        return f'{base} {param.name}'
+        return _PARAM_FORMATTERS[self._param_kind(param.type)](param)
 
     def _c_params_str(self, params: list[Param]) -> str:
         return ", ".join(self._param_to_c(p) for p in params) or "void"
 
     def _c_return_type_for_method(self, iface_name: str, idl_type: str) -> str:
         """Get C return type, using per-method result types for vectors"""
-        if TypeMapper.is_vector(idl_type):
-            inner = TypeMapper.vector_inner(idl_type)
-            result_name = self._result_struct_name(iface_name, inner)
-            return f"{result_name}*"
+        is_vec, inner = TypeMapper.parse_vector(idl_type)
+        if is_vec:
+            return f"{self._result_struct_name(iface_name, inner)}*"
         if idl_type == "void":
             return "void"
         if idl_type == "bool":
@@ -473,15 +605,9 @@ class CAPIGenerator:
                 return f"{base_type}Handle*"
         return TypeMapper.to_c(idl_type)
 
-    def _c_return_type(self, idl_type: str, result_type: str) -> str:
-        if TypeMapper.is_vector(idl_type):
-            return f"{result_type}*"
-        if idl_type == "void":
-            return "void"
-        if idl_type == "bool":
-            return "int"
-        return TypeMapper.to_c(idl_type)
-
-    def _getter_name(self, member: Member) -> str:
-        prefix = "is" if member.type == "bool" else "get"
-        return f"{prefix}{member.name[0].upper()}{member.name[1:]}"
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _getter_name(name: str, idl_type: str) -> str:
+        """C API and C++ getter name, e.g. isVisible / getWidth; keyed by strings so the cache holds no members"""
+        prefix = "is" if idl_type == "bool" else "get"
+        return f"{prefix}{name[:1].upper()}{name[1:]}"
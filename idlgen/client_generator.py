@@ -1,441 +1,673 @@
 """Client Generator - generates C++ wrapper for dynamic library loading"""
 
-from .types import ParsedIDL, Class, Method, Member, Param, Callback
+import io
+from collections import namedtuple
+from functools import lru_cache
+from typing import Iterator
+
+from .types import ParsedIDL, Class, Method, Param
 from .type_mapper import TypeMapper
 
 
+# Names around one vector element type: C result struct, its ::-qualified form, client wrapper class
+_ResultNames = namedtuple("_ResultNames", "inner result c_result client")
+
+# A class split into what the emitters need: first constructor, other methods,
+# result names per vector element type (first-use order, matching the C API)
+# and (member, getter name) pairs
+_ClassParts = namedtuple("_ClassParts", "ctor methods results getters")
+
+
+# initialize() around the per-symbol loads; neither part depends on the IDL
+_INIT_PROLOGUE = (
+    "bool initialize(const std::string& libraryPath) {\n"
+    "    if (g_library) return true;\n"
+    "\n"
+    "#ifdef _WIN32\n"
+    "    g_library = LoadLibraryA(libraryPath.c_str());\n"
+    "#else\n"
+    "    g_library = dlopen(libraryPath.c_str(), RTLD_NOW);\n"
+    "#endif\n"
+    "    if (!g_library) return false;\n"
+    "\n"
+)
+
+_INIT_EPILOGUE = (
+    "\n"
+    "    return true;\n"
+    "}\n"
+    "\n"
+)
+
+_IS_INITIALIZED = "bool isInitialized() { return g_library != nullptr; }\n\n"
+
+# Fixed file scaffolding, formatted once per generator with the namespace
+_HEADER_INCLUDES_TPL = (
+    "// AUTO-GENERATED - DO NOT EDIT\n"
+    "#pragma once\n"
+    "\n"
+    "#include <string>\n"
+    "#include <vector>\n"
+    "#include <memory>\n"
+    "#include <functional>\n"
+    '#include "{ns}_c_api.h"\n'
+    "\n"
+)
+
+_HEADER_OPEN_TPL = (
+    "namespace {ns}_client {{\n"
+    "\n"
+    "bool initialize(const std::string& libraryPath);\n"
+    "bool isInitialized();\n"
+    "\n"
+    "template <class T>\n"
+    "using Owned = std::unique_ptr<T, void(*)(T*)>;\n"
+    "\n"
+)
+
+_IMPL_INCLUDES_TPL = (
+    "// AUTO-GENERATED - DO NOT EDIT\n"
+    '#include "{ns}_client.hpp"\n'
+    "\n"
+)
+
+# Platform headers the dynamic loader needs
+_LOADER_INCLUDES = (
+    "#ifdef _WIN32\n"
+    "#include <windows.h>\n"
+    "#else\n"
+    "#include <dlfcn.h>\n"
+    "#endif\n"
+    "\n"
+    "#include <stdexcept>\n"
+    "\n"
+)
+
+_LOAD_SYMBOL_TPL = (
+    "\n"
+    "{fn}void* loadSymbol(const char* name) {{\n"
+    "#ifdef _WIN32\n"
+    "    return reinterpret_cast<void*>(GetProcAddress(static_cast<HMODULE>(g_library), name));\n"
+    "#else\n"
+    "    return dlsym(g_library, name);\n"
+    "#endif\n"
+    "}}\n"
+    "\n"
+)
+
+# Client result wrapper around one C result struct, formatted with r=_ResultNames
+_RESULT_CLASS_DECL_TPL = (
+    "class {r.client} {{\n"
+    "public:\n"
+    "    {r.client}();\n"
+    "    explicit {r.client}({r.c_result}* result);\n"
+    "    ~{r.client}() = default;\n"
+    "    {r.client}({r.client}&&) noexcept = default;\n"
+    "    {r.client}& operator=({r.client}&&) noexcept = default;\n"
+    "\n"
+    "    [[nodiscard]] int count() const;\n"
+    "    [[nodiscard]] const {r.inner}* data() const;\n"
+    "    [[nodiscard]] std::vector<{r.inner}> toVector() const;\n"
+    "\n"
+    "private:\n"
+    "    Owned<{r.c_result}> result_;\n"
+    "}};\n"
+    "\n"
+)
+
+_RESULT_CLASS_IMPL_TPL = (
+    "{internal}void destroy_{r.result}({r.c_result}* r) noexcept {{ if (r && g_{r.result}_free) g_{r.result}_free(r); }}\n"
+    "\n"
+    "{fn}{r.client}::{r.client}() : result_(nullptr, &destroy_{r.result}) {{}}\n"
+    "\n"
+    "{fn}{r.client}::{r.client}({r.c_result}* result)\n"
+    "    : result_(result, &destroy_{r.result}) {{}}\n"
+    "\n"
+    "{fn}int {r.client}::count() const {{\n"
+    "    return result_ ? g_{r.result}_getCount(result_.get()) : 0;\n"
+    "}}\n"
+    "\n"
+    "{fn}const {r.inner}* {r.client}::data() const {{\n"
+    "    return result_ ? g_{r.result}_getData(result_.get()) : nullptr;\n"
+    "}}\n"
+    "\n"
+    "{fn}std::vector<{r.inner}> {r.client}::toVector() const {{\n"
+    "    std::vector<{r.inner}> vec;\n"
+    "    int n = count();\n"
+    "    auto* d = data();\n"
+    "    if (n > 0 && d) vec.assign(d, d + n);\n"
+    "    return vec;\n"
+    "}}\n"
+    "\n"
+)
+
+# Client class constructor with its stateless deleter (a plain function
+# pointer keeps handle_ two pointers wide)
+_CTOR_IMPL_TPL = (
+    "{internal}void destroy_{name}(::{handle}* p) noexcept {{ if (p && g_{name}_destroy) g_{name}_destroy(p); }}\n"
+    "\n"
+    "{fn}{name}::{name}({cpp_params})\n"
+    "    : handle_(nullptr, &destroy_{name}) {{\n"
+    '    if (!isInitialized()) throw std::runtime_error("Library not initialized");\n'
+    "    auto* h = g_{name}_create({c_args});\n"
+    "    handle_ = Owned<::{handle}>(h, &destroy_{name});\n"
+    "}}\n"
+    "\n"
+)
+
+_GETTER_IMPL_TPL = (
+    "{fn}{ret} {name}::{getter}() const noexcept {{\n"
+    "    return handle_ && g_{name}_{getter} ? g_{name}_{getter}(handle_.get()) : {default};\n"
+    "}}\n"
+    "\n"
+)
+
+# Adapts a callable to the C API's plain function pointer for the lifetime of
+# the returned guard; the previous binding is restored on exit, so nested
+# calls taking the same callback type stay correct. Tag is the parameter
+# position, giving each callback parameter of a method its own slot
+_TRAMPOLINE = (
+    "template <class CFn, int Tag, class F>\n"
+    "class Trampoline;\n"
+    "\n"
+    "template <class R, class... A, int Tag, class F>\n"
+    "class Trampoline<R(*)(A...), Tag, F> {\n"
+    "public:\n"
+    "    using Fn = R(*)(A...);\n"
+    "    explicit Trampoline(const F& f) : prev_(slot_) { slot_ = &f; }\n"
+    "    ~Trampoline() { slot_ = prev_; }\n"
+    "    Trampoline(const Trampoline&) = delete;\n"
+    "    Trampoline& operator=(const Trampoline&) = delete;\n"
+    "    operator Fn() const { return &call; }\n"
+    "\n"
+    "private:\n"
+    "    static R call(A... args) { return (*slot_)(args...); }\n"
+    "    static inline thread_local const F* slot_ = nullptr;\n"
+    "    const F* prev_;\n"
+    "};\n"
+    "\n"
+    "template <class CFn, int Tag, class F>\n"
+    "Trampoline<CFn, Tag, F> make_trampoline(const F& f) { return Trampoline<CFn, Tag, F>(f); }\n"
+    "\n"
+)
+
+# Move-only special members of a client class, then its closing private section
+_CLASS_SPECIAL_MEMBERS_TPL = (
+    "    ~{name}() = default;\n"
+    "\n"
+    "    {name}(const {name}&) = delete;\n"
+    "    {name}& operator=(const {name}&) = delete;\n"
+    "    {name}({name}&&) noexcept = default;\n"
+    "    {name}& operator=({name}&&) noexcept = default;\n"
+    "\n"
+)
+
+_CLASS_PRIVATE_TPL = (
+    "\n"
+    "private:\n"
+    "    Owned<::{h}> handle_;\n"
+    "}};\n"
+    "\n"
+)
+
+# A method's C++ parameter declarations, C call arguments and C parameter types
+_Signatures = namedtuple("_Signatures", "cpp_params c_args c_types")
+
+
+class _Writer:
+    """Accumulates generated text in one buffer instead of a list of lines"""
+
+    __slots__ = ("_buf", "_write")
+
+    def __init__(self):
+        self._buf = io.StringIO()
+        self._write = self._buf.write
+
+    def line(self, text: str = ""):
+        self._write(text)
+        self._write("\n")
+
+    def lines(self, texts):
+        write = self._write
+        for text in texts:
+            write(text)
+            write("\n")
+
+    def block(self, text: str):
+        """Write text verbatim; it carries its own newlines"""
+        self._write(text)
+
+    def getvalue(self) -> str:
+        return self._buf.getvalue()
+
+
+# Rendered outputs kept across generator instances (watch loops, multi-target builds)
+_RENDER_CACHE_SIZE = 8
+
+
 class ClientGenerator:
     """Generates C++ client wrapper for dynamic loading"""
 
-    def __init__(self, idl: ParsedIDL, namespace: str):
+    # (fingerprint hash, namespace, emit_inline, part) -> (fingerprint, rendered text)
+    _render_cache: dict[tuple, tuple[tuple, str]] = {}
+
+    def __init__(self, idl: ParsedIDL, namespace: str, emit_inline: bool = False):
         self.idl = idl
         self.namespace = namespace
+        # Header-only mode: the implementation is emitted into the header with
+        # inline functions and C++17 inline variables, and there is no .cpp
+        self.emit_inline = emit_inline
+        self._callbacks = {cb.name: cb for cb in idl.callbacks}
+        self._struct_names = {d.name for d in idl.structs}
+        # Prefixes for function/variable definitions and for translation-unit-local helpers
+        self._fn = "inline " if emit_inline else ""
+        self._internal = "inline " if emit_inline else "static "
+        ns = namespace
+        loader = _LOADER_INCLUDES if emit_inline else ""
+        self._header_prelude = _HEADER_INCLUDES_TPL.format(ns=ns) + loader + _HEADER_OPEN_TPL.format(ns=ns)
+        self._impl_prelude = _IMPL_INCLUDES_TPL.format(ns=ns) + _LOADER_INCLUDES + f"namespace {ns}_client {{\n\n"
+        self._load_symbol = _LOAD_SYMBOL_TPL.format(fn=self._fn)
+        self._closing = f"}} // namespace {ns}_client"
+        # Per-class partition shared by the header, fn-pointer, initialize and impl emitters
+        self._parts_cache: dict[str, _ClassParts] = {}
+        # Keyed by id(): methods live as long as self.idl, which this generator holds
+        self._signature_cache: dict[int, _Signatures] = {}
+        # Render-cache fingerprint of self.idl, built on first use
+        self._fingerprint_cache = None
+
+    def _signatures(self, method: Method) -> "_Signatures":
+        """Rendered parameter lists for a method, shared by its declaration, fn-pointer type and definition"""
+        sig = self._signature_cache.get(id(method))
+        if sig is None:
+            params = method.params
+            sig = self._signature_cache[id(method)] = _Signatures(
+                cpp_params=", ".join([self._param_to_cpp_decl(p) for p in params]),
+                c_args=", ".join([self._to_c_arg(p) for p in params]),
+                c_types=", ".join([self._param_to_c_type(p) for p in params]),
+            )
+        return sig
+
+    def _partition(self, cls: Class) -> "_ClassParts":
+        """Split a class into the pieces every emitter walks, in one pass, once per class"""
+        parts = self._parts_cache.get(cls.name)
+        if parts is None:
+            ctor = None
+            methods = []
+            for m in cls.methods:
+                if m.is_constructor:
+                    ctor = ctor or m
+                else:
+                    methods.append(m)
+            parts = self._parts_cache[cls.name] = _ClassParts(
+                ctor=ctor,
+                methods=tuple(methods),
+                results=tuple(self._result_names(cls.name, inner) for inner in cls.vector_inners),
+                getters=tuple((member, self._getter_name(member.name, member.type)) for member in cls.members),
+            )
+        return parts
 
     def generate_header(self) -> str:
-        lines = [
-            "// AUTO-GENERATED - DO NOT EDIT",
-            "#pragma once",
-            "",
-            "#include <string>",
-            "#include <vector>",
-            "#include <memory>",
-            "#include <functional>",
-            f'#include "{self.namespace}_c_api.h"',
-            "",
-            f"namespace {self.namespace}_client {{",
-            "",
-            "bool initialize(const std::string& libraryPath);",
-            "bool isInitialized();",
-            "",
-        ]
+        return self._rendered("header", self.iter_header)
 
-        # Generate using declarations for enums
-        for e in self.idl.enums:
-            lines.append(f"using {e.name} = ::{e.name};")
-        if self.idl.enums:
-            lines.append("")
+    def iter_header(self) -> Iterator[str]:
+        """Yield the header in chunks (prelude, one per class, closing line) for streaming writes"""
+        w = _Writer()
+        w.block(self._header_prelude)
 
-        for d in self.idl.structs:
-            lines.append(f"using {d.name} = ::{d.name};")
-        if self.idl.structs:
-            lines.append("")
+        # Generate using declarations for enums and structs
+        w.block(self._using_block([e.name for e in self.idl.enums]))
+        w.block(self._using_block([d.name for d in self.idl.structs]))
 
         # Generate std::function typedefs for callbacks
-        lines.extend(self._generate_callback_typedefs())
+        self._generate_callback_typedefs(w)
+        yield w.getvalue()
 
         for cls in self.idl.classes:
-            lines.extend(self._class_header(cls))
+            w = _Writer()
+            self._class_header(cls, w)
+            yield w.getvalue()
 
-        lines.append(f"}} // namespace {self.namespace}_client")
-        return "\n".join(lines)
+        if self.emit_inline:
+            yield from self._iter_impl_body()
 
-    def _generate_callback_typedefs(self) -> list[str]:
+        # Last line carries no trailing newline
+        yield self._closing
+
+    @staticmethod
+    def _using_block(names: list[str]) -> str:
+        """Aliases for C API types, followed by a blank line; empty when there are none"""
+        if not names:
+            return ""
+        return "".join([f"using {name} = ::{name};\n" for name in names]) + "\n"
+
+    def _generate_callback_typedefs(self, w: _Writer):
         """Generate std::function typedefs for callback types"""
-        lines = []
+        if not self.idl.callbacks:
+            return
         for cb in self.idl.callbacks:
-            params = ", ".join(TypeMapper.to_cpp(p.type) for p in cb.params)
+            params = ", ".join([TypeMapper.to_cpp(p.type) for p in cb.params])
             ret = TypeMapper.to_cpp(cb.return_type)
-            lines.append(f"using {cb.name} = std::function<{ret}({params})>;")
-        if self.idl.callbacks:
-            lines.append("")
-        return lines
+            w.line(f"using {cb.name} = std::function<{ret}({params})>;")
+        w.line()
+        w.block(_TRAMPOLINE)
 
     def generate_impl(self) -> str:
-        lines = [
-            "// AUTO-GENERATED - DO NOT EDIT",
-            f'#include "{self.namespace}_client.hpp"',
-            "",
-            "#ifdef _WIN32",
-            "#include <windows.h>",
-            "#else",
-            "#include <dlfcn.h>",
-            "#endif",
-            "",
-            "#include <stdexcept>",
-            "",
-            f"namespace {self.namespace}_client {{",
-            "",
-            "namespace {",
-            "",
-            "void* g_library = nullptr;",
-            "",
-        ]
-
+        """Client implementation; empty in header-only mode, where generate_header carries it"""
+        return self._rendered("impl", self.iter_impl)
+
+    def _rendered(self, part: str, render) -> str:
+        """Rendered text for part, shared with earlier generators for the same IDL and options"""
+        cache = ClientGenerator._render_cache
+        fingerprint = self._fingerprint()
+        key = (hash(fingerprint), self.namespace, self.emit_inline, part)
+        entry = cache.get(key)
+        # Compare the full fingerprint on a hit so a hash collision never returns another IDL's text
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        text = "".join(render())
+        if key not in cache and len(cache) >= _RENDER_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[key] = (fingerprint, text)
+        return text
+
+    def _fingerprint(self) -> tuple:
+        """Every IDL field the client output depends on, built once per generator"""
+        if self._fingerprint_cache is None:
+            idl = self.idl
+
+            def params(ps):
+                return tuple([(p.type, p.name, p.is_const, p.is_pointer, p.is_reference) for p in ps])
+
+            def members(ms):
+                return tuple([(m.name, m.type, m.is_const) for m in ms])
+
+            self._fingerprint_cache = (
+                tuple([(e.name, tuple([(v.name, v.value) for v in e.values])) for e in idl.enums]),
+                tuple([(d.name, members(d.members)) for d in idl.structs]),
+                tuple([
+                    (c.name, members(c.members),
+                     tuple([(m.name, m.return_type, m.is_constructor, m.is_const, params(m.params))
+                            for m in c.methods]))
+                    for c in idl.classes
+                ]),
+                tuple([(cb.name, cb.return_type, params(cb.params)) for cb in idl.callbacks]),
+            )
+        return self._fingerprint_cache
+
+    def iter_impl(self) -> Iterator[str]:
+        """Yield the implementation in chunks; yields nothing in header-only mode"""
+        if self.emit_inline:
+            return
+        yield self._impl_prelude
+        yield from self._iter_impl_body()
+        yield self._closing
+
+    def generate_header_to(self, path):
+        """Stream the header to path chunk by chunk, without building the whole string"""
+        with open(path, "w", buffering=1 << 20) as f:
+            f.writelines(self.iter_header())
+
+    def generate_impl_to(self, path):
+        """Stream the implementation to path chunk by chunk"""
+        with open(path, "w", buffering=1 << 20) as f:
+            f.writelines(self.iter_impl())
+
+    def _iter_impl_body(self) -> Iterator[str]:
+        """Loader state and initialize() as one chunk, then one chunk per class definition"""
+        fn = self._fn
+        # One pass over the classes fills every per-class section; the sections
+        # are then written out in file order
+        types, ptrs = _Writer(), _Writer()
+        symbols = []
+        impls = []
         for cls in self.idl.classes:
-            lines.extend(self._fn_pointer_types(cls))
-
-        lines.append("")
-
-        for cls in self.idl.classes:
-            lines.extend(self._fn_pointer_vars(cls))
-
-        lines.extend([
-            "",
-            "void* loadSymbol(const char* name) {",
-            "#ifdef _WIN32",
-            "    return reinterpret_cast<void*>(GetProcAddress(static_cast<HMODULE>(g_library), name));",
-            "#else",
-            "    return dlsym(g_library, name);",
-            "#endif",
-            "}",
+            self._fn_pointer_types(cls, types)
+            self._fn_pointer_vars(cls, ptrs)
+            symbols += self._symbols(cls)
+            impl = _Writer()
+            self._class_impl(cls, impl)
+            impls.append(impl.getvalue())
+
+        w = _Writer()
+        # Loader state is private to the .cpp; a header shares one inline copy across TUs
+        w.lines((
+            "namespace detail {" if self.emit_inline else "namespace {",
             "",
-            "} // namespace",
+            f"{fn}void* g_library = nullptr;",
             "",
-        ])
-
-        lines.extend(self._initialize_fn())
-
-        for cls in self.idl.classes:
-            lines.extend(self._class_impl(cls))
+        ))
+        w.block(types.getvalue())
+        w.line()
+        w.block(ptrs.getvalue())
+        w.block(self._load_symbol)
+        if self.emit_inline:
+            w.lines(("} // namespace detail", "", "using namespace detail;", ""))
+        else:
+            w.lines(("} // namespace", ""))
 
-        lines.append(f"}} // namespace {self.namespace}_client")
-        return "\n".join(lines)
+        self._initialize_fn(symbols, w)
+        yield w.getvalue()
+        yield from impls
 
-    def _class_header(self, cls: Class) -> list[str]:
+    def _class_header(self, cls: Class, w: _Writer):
         h = f"{cls.name}Handle"
-        lines = []
+        parts = self._partition(cls)
 
         # Result class - one per unique vector element type
-        vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-        result_types = set()
-        for m in vec_methods:
-            inner = TypeMapper.vector_inner(m.return_type)
-            result_types.add(inner)
-        
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            c_result_name = f"::{result_name}"
-            client_result = self._client_result_name(cls.name, inner)
-            lines.extend([
-                f"class {client_result} {{",
-                "public:",
-                f"    {client_result}();",
-                f"    explicit {client_result}({c_result_name}* result);",
-                f"    ~{client_result}() = default;",
-                f"    {client_result}({client_result}&&) noexcept = default;",
-                f"    {client_result}& operator=({client_result}&&) noexcept = default;",
-                "",
-                "    [[nodiscard]] int count() const;",
-                f"    [[nodiscard]] const {inner}* data() const;",
-                f"    [[nodiscard]] std::vector<{inner}> toVector() const;",
-                "",
-                "private:",
-                f"    std::unique_ptr<{c_result_name}, std::function<void({c_result_name}*)>> result_;",
-                "};",
-                "",
-            ])
+        for names in parts.results:
+            w.block(_RESULT_CLASS_DECL_TPL.format(r=names))
 
         # Main class
-        lines.append(f"class {cls.name} {{")
-        lines.append("public:")
+        w.line(f"class {cls.name} {{")
+        w.line("public:")
 
-        ctor = next((m for m in cls.methods if m.is_constructor), None)
+        ctor = parts.ctor
         if ctor:
-            cpp_params = ", ".join(self._param_to_cpp_decl(p) for p in ctor.params)
-            lines.append(f"    explicit {cls.name}({cpp_params});")
+            cpp_params = self._signatures(ctor).cpp_params
+            w.line(f"    explicit {cls.name}({cpp_params});")
 
-        lines.extend([
-            f"    ~{cls.name}() = default;",
-            "",
-            f"    {cls.name}(const {cls.name}&) = delete;",
-            f"    {cls.name}& operator=(const {cls.name}&) = delete;",
-            f"    {cls.name}({cls.name}&&) noexcept = default;",
-            f"    {cls.name}& operator=({cls.name}&&) noexcept = default;",
-            "",
-        ])
+        w.block(_CLASS_SPECIAL_MEMBERS_TPL.format(name=cls.name))
 
-        for member in cls.members:
-            ret = TypeMapper.to_cpp(member.type)
-            getter = self._getter_name(member)
-            lines.append(f"    [[nodiscard]] {ret} {getter}() const noexcept;")
+        # Bound once per class: the loops below call these per member/method
+        line = w.line
+        to_cpp = TypeMapper.to_cpp
+        cpp_return_type = self._cpp_return_type
+        signatures = self._signatures
 
-        for method in cls.methods:
-            if method.is_constructor:
-                continue
-            ret = self._cpp_return_type(cls.name, method.return_type)
-            params = ", ".join(self._param_to_cpp_decl(p) for p in method.params)
-            const_q = " const" if method.is_const else ""
-            lines.append(f"    [[nodiscard]] {ret} {method.name}({params}){const_q};")
+        for member, getter in parts.getters:
+            line(f"    [[nodiscard]] {to_cpp(member.type)} {getter}() const noexcept;")
 
-        lines.extend([
-            "",
-            "private:",
-            f"    std::unique_ptr<::{h}, std::function<void(::{h}*)>> handle_;",
-            "};",
-            "",
-        ])
+        for method in parts.methods:
+            ret = cpp_return_type(cls.name, method.return_type)
+            params = signatures(method).cpp_params
+            const_q = " const" if method.is_const else ""
+            line(f"    [[nodiscard]] {ret} {method.name}({params}){const_q};")
 
-        return lines
+        w.block(_CLASS_PRIVATE_TPL.format(h=h))
 
-    def _fn_pointer_types(self, cls: Class) -> list[str]:
+    def _fn_pointer_types(self, cls: Class, w: _Writer):
+        # No C functions to point at: nothing to emit
+        if not cls.methods and not cls.members:
+            return
         h = f"{cls.name}Handle"
         prefix = cls.name
-        lines = []
+        parts = self._partition(cls)
 
-        ctor = next((m for m in cls.methods if m.is_constructor), None)
+        ctor = parts.ctor
         if ctor:
-            c_params = ", ".join(self._param_to_c_type(p) for p in ctor.params) or "void"
-            lines.append(f"using {prefix}CreateFn = {h}*(*)({c_params});")
-            lines.append(f"using {prefix}DestroyFn = void(*)({h}*);")
-
-        for method in cls.methods:
-            if method.is_constructor:
-                continue
-            ret = self._c_return_type_for_method(cls.name, method.return_type)
-            params = [f"{h}*"] + [self._param_to_c_type(p) for p in method.params]
-            fn_name = method.name[0].upper() + method.name[1:]
-            lines.append(f"using {prefix}{fn_name}Fn = {ret}(*)({', '.join(params)});")
+            c_params = self._signatures(ctor).c_types or "void"
+            w.block(
+                f"using {prefix}CreateFn = {h}*(*)({c_params});\n"
+                f"using {prefix}DestroyFn = void(*)({h}*);\n"
+            )
+
+        line = w.line
+        pascal_name = self._pascal_name
+        c_return_type = self._c_return_type_for_method
+        signatures = self._signatures
+
+        for method in parts.methods:
+            ret = c_return_type(prefix, method.return_type)
+            c_types = signatures(method).c_types
+            params = f"{h}*, {c_types}" if c_types else f"{h}*"
+            line(f"using {prefix}{pascal_name(method.name)}Fn = {ret}(*)({params});")
 
         # Function pointers for result accessors per unique element type
-        vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-        result_types = set()
-        for m in vec_methods:
-            inner = TypeMapper.vector_inner(m.return_type)
-            result_types.add(inner)
-        
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            lines.append(f"using {result_name}GetCountFn = int(*)(const {result_name}*);")
-            lines.append(f"using {result_name}GetDataFn = const {inner}*(*)(const {result_name}*);")
-            lines.append(f"using {result_name}FreeFn = void(*)({result_name}*);")
-
-        for member in cls.members:
-            ret = "int" if member.type == "bool" else TypeMapper.to_c(member.type)
-            getter = self._getter_name(member)
-            fn_name = getter[0].upper() + getter[1:]
-            lines.append(f"using {prefix}{fn_name}Fn = {ret}(*)({h}*);")
-
-        return lines
-
-    def _fn_pointer_vars(self, cls: Class) -> list[str]:
+        for inner, result_name, _, _ in parts.results:
+            w.block(
+                f"using {result_name}GetCountFn = int(*)(const {result_name}*);\n"
+                f"using {result_name}GetDataFn = const {inner}*(*)(const {result_name}*);\n"
+                f"using {result_name}FreeFn = void(*)({result_name}*);\n"
+            )
+
+        to_c = TypeMapper.to_c
+        for member, getter in parts.getters:
+            ret = "int" if member.type == "bool" else to_c(member.type)
+            line(f"using {prefix}{pascal_name(getter)}Fn = {ret}(*)({h}*);")
+
+    def _fn_pointer_vars(self, cls: Class, w: _Writer):
+        if not cls.methods and not cls.members:
+            return
+        fn = self._fn
         prefix = cls.name
-        lines = []
+        parts = self._partition(cls)
 
-        ctor = next((m for m in cls.methods if m.is_constructor), None)
+        ctor = parts.ctor
         if ctor:
-            lines.append(f"{prefix}CreateFn g_{prefix}_create = nullptr;")
-            lines.append(f"{prefix}DestroyFn g_{prefix}_destroy = nullptr;")
-
-        for method in cls.methods:
-            if method.is_constructor:
-                continue
-            fn_name = method.name[0].upper() + method.name[1:]
-            lines.append(f"{prefix}{fn_name}Fn g_{prefix}_{method.name} = nullptr;")
-
-        # Variables for result accessors per unique element type
-        vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-        result_types = set()
-        for m in vec_methods:
-            inner = TypeMapper.vector_inner(m.return_type)
-            result_types.add(inner)
-        
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            lines.append(f"{result_name}GetCountFn g_{result_name}_getCount = nullptr;")
-            lines.append(f"{result_name}GetDataFn g_{result_name}_getData = nullptr;")
-            lines.append(f"{result_name}FreeFn g_{result_name}_free = nullptr;")
-
-        for member in cls.members:
-            getter = self._getter_name(member)
-            fn_name = getter[0].upper() + getter[1:]
-            lines.append(f"{prefix}{fn_name}Fn g_{prefix}_{getter} = nullptr;")
-
-        return lines
-
-    def _initialize_fn(self) -> list[str]:
-        lines = [
-            "bool initialize(const std::string& libraryPath) {",
-            "    if (g_library) return true;",
-            "",
-            "#ifdef _WIN32",
-            "    g_library = LoadLibraryA(libraryPath.c_str());",
-            "#else",
-            "    g_library = dlopen(libraryPath.c_str(), RTLD_NOW);",
-            "#endif",
-            "    if (!g_library) return false;",
-            "",
-        ]
+            w.block(
+                f"{fn}{prefix}CreateFn g_{prefix}_create = nullptr;\n"
+                f"{fn}{prefix}DestroyFn g_{prefix}_destroy = nullptr;\n"
+            )
 
-        for cls in self.idl.classes:
-            prefix = cls.name
-
-            ctor = next((m for m in cls.methods if m.is_constructor), None)
-            if ctor:
-                lines.append(f'    g_{prefix}_create = reinterpret_cast<{prefix}CreateFn>(loadSymbol("{prefix}_create"));')
-                lines.append(f'    g_{prefix}_destroy = reinterpret_cast<{prefix}DestroyFn>(loadSymbol("{prefix}_destroy"));')
-
-            for method in cls.methods:
-                if method.is_constructor:
-                    continue
-                fn_name = method.name[0].upper() + method.name[1:]
-                lines.append(f'    g_{prefix}_{method.name} = reinterpret_cast<{prefix}{fn_name}Fn>(loadSymbol("{prefix}_{method.name}"));')
-
-            # Load result accessors per unique element type
-            vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-            result_types = set()
-            for m in vec_methods:
-                inner = TypeMapper.vector_inner(m.return_type)
-                result_types.add(inner)
-            
-            for inner in sorted(result_types):
-                result_name = self._result_struct_name(cls.name, inner)
-                lines.append(f'    g_{result_name}_getCount = reinterpret_cast<{result_name}GetCountFn>(loadSymbol("{result_name}_getCount"));')
-                lines.append(f'    g_{result_name}_getData = reinterpret_cast<{result_name}GetDataFn>(loadSymbol("{result_name}_getData"));')
-                lines.append(f'    g_{result_name}_free = reinterpret_cast<{result_name}FreeFn>(loadSymbol("{result_name}_free"));')
-
-            for member in cls.members:
-                getter = self._getter_name(member)
-                fn_name = getter[0].upper() + getter[1:]
-                lines.append(f'    g_{prefix}_{getter} = reinterpret_cast<{prefix}{fn_name}Fn>(loadSymbol("{prefix}_{getter}"));')
-
-        lines.extend([
-            "",
-            "    return true;",
-            "}",
-            "",
-            "bool isInitialized() { return g_library != nullptr; }",
-            "",
-        ])
+        line = w.line
+        pascal_name = self._pascal_name
 
-        return lines
+        for method in parts.methods:
+            line(f"{fn}{prefix}{pascal_name(method.name)}Fn g_{prefix}_{method.name} = nullptr;")
 
-    def _class_impl(self, cls: Class) -> list[str]:
+        # Variables for result accessors per unique element type
+        for inner, result_name, _, _ in parts.results:
+            w.block(
+                f"{fn}{result_name}GetCountFn g_{result_name}_getCount = nullptr;\n"
+                f"{fn}{result_name}GetDataFn g_{result_name}_getData = nullptr;\n"
+                f"{fn}{result_name}FreeFn g_{result_name}_free = nullptr;\n"
+            )
+
+        for member, getter in parts.getters:
+            line(f"{fn}{prefix}{pascal_name(getter)}Fn g_{prefix}_{getter} = nullptr;")
+
+    def _initialize_fn(self, symbols: list[str], w: _Writer):
+        w.block(self._fn + _INIT_PROLOGUE)
+
+        # Every exported symbol is loaded into the g_<symbol> pointer of the same name
+        if symbols:
+            w.lines((
+                "    struct SymbolEntry { const char* name; void** slot; };",
+                "    static const SymbolEntry kSymbols[] = {",
+            ))
+            w.lines(f'        {{"{sym}", reinterpret_cast<void**>(&g_{sym})}},' for sym in symbols)
+            w.lines((
+                "    };",
+                "    for (const auto& e : kSymbols) *e.slot = loadSymbol(e.name);",
+            ))
+
+        w.block(_INIT_EPILOGUE)
+        w.block(self._fn + _IS_INITIALIZED)
+
+    def _symbols(self, cls: Class) -> list[str]:
+        """C API symbols a class's wrapper loads, in declaration order"""
+        if not cls.methods and not cls.members:
+            return []
+        prefix = cls.name
+        parts = self._partition(cls)
+        symbols = []
+        if parts.ctor:
+            symbols += [f"{prefix}_create", f"{prefix}_destroy"]
+        symbols.extend(f"{prefix}_{method.name}" for method in parts.methods)
+        # Result accessors per unique element type
+        for _, result_name, _, _ in parts.results:
+            symbols += [f"{result_name}_getCount", f"{result_name}_getData", f"{result_name}_free"]
+        symbols.extend(f"{prefix}_{getter}" for _, getter in parts.getters)
+        return symbols
+
+    def _class_impl(self, cls: Class, w: _Writer):
         prefix = cls.name
         h = f"{cls.name}Handle"
-        lines = []
+        parts = self._partition(cls)
 
         # Result class impl - one per unique vector element type
-        vec_methods = [m for m in cls.methods if TypeMapper.is_vector(m.return_type)]
-        result_types = set()
-        for m in vec_methods:
-            inner = TypeMapper.vector_inner(m.return_type)
-            result_types.add(inner)
-        
-        for inner in sorted(result_types):
-            result_name = self._result_struct_name(cls.name, inner)
-            c_result_name = f"::{result_name}"
-            client_result = self._client_result_name(cls.name, inner)
-            lines.extend([
-                f"{client_result}::{client_result}() : result_(nullptr, nullptr) {{}}",
-                "",
-                f"{client_result}::{client_result}({c_result_name}* result)",
-                f"    : result_(result, []({c_result_name}* r) {{ if (r && g_{result_name}_free) g_{result_name}_free(r); }}) {{}}",
-                "",
-                f"int {client_result}::count() const {{",
-                f"    return result_ ? g_{result_name}_getCount(result_.get()) : 0;",
-                "}",
-                "",
-                f"const {inner}* {client_result}::data() const {{",
-                f"    return result_ ? g_{result_name}_getData(result_.get()) : nullptr;",
-                "}",
-                "",
-                f"std::vector<{inner}> {client_result}::toVector() const {{",
-                f"    std::vector<{inner}> vec;",
-                "    int n = count();",
-                "    auto* d = data();",
-                "    if (n > 0 && d) vec.assign(d, d + n);",
-                "    return vec;",
-                "}",
-                "",
-            ])
+        for names in parts.results:
+            w.block(_RESULT_CLASS_IMPL_TPL.format(r=names, fn=self._fn, internal=self._internal))
 
         # Main class impl
-        ctor = next((m for m in cls.methods if m.is_constructor), None)
+        ctor = parts.ctor
         if ctor:
-            cpp_params = ", ".join(self._param_to_cpp_decl(p) for p in ctor.params)
-            c_args = ", ".join(self._to_c_arg(p) for p in ctor.params)
-
-            lines.extend([
-                f"{cls.name}::{cls.name}({cpp_params})",
-                "    : handle_(nullptr, nullptr) {",
-                '    if (!isInitialized()) throw std::runtime_error("Library not initialized");',
-                f"    auto* h = g_{prefix}_create({c_args});",
-                f"    handle_ = std::unique_ptr<::{h}, std::function<void(::{h}*)>>(h,",
-                f"        [](::{h}* p) {{ if (p && g_{prefix}_destroy) g_{prefix}_destroy(p); }});",
-                "}",
-                "",
-            ])
-
-        for member in cls.members:
-            ret = TypeMapper.to_cpp(member.type)
-            getter = self._getter_name(member)
-            default = "false" if member.type == "bool" else "0"
-            lines.extend([
-                f"{ret} {cls.name}::{getter}() const noexcept {{",
-                f"    return handle_ && g_{prefix}_{getter} ? g_{prefix}_{getter}(handle_.get()) : {default};",
-                "}",
-                "",
-            ])
-
-        for method in cls.methods:
-            if method.is_constructor:
-                continue
-            lines.extend(self._method_impl(cls, method, prefix))
-
-        return lines
-
-    def _method_impl(self, cls: Class, method: Method, prefix: str) -> list[str]:
+            cpp_params, c_args, _ = self._signatures(ctor)
+            w.block(_CTOR_IMPL_TPL.format(
+                name=prefix, handle=h, fn=self._fn, internal=self._internal,
+                cpp_params=cpp_params, c_args=c_args,
+            ))
+
+        for member, getter in parts.getters:
+            w.block(_GETTER_IMPL_TPL.format(
+                fn=self._fn,
+                ret=TypeMapper.to_cpp(member.type),
+                name=prefix,
+                getter=getter,
+                default="false" if member.type == "bool" else "0",
+            ))
+
+        for method in parts.methods:
+            self._method_impl(cls, method, prefix, w)
+
+    def _method_impl(self, cls: Class, method: Method, prefix: str, w: _Writer):
         """Generate method implementation, handling callbacks specially"""
         ret = self._cpp_return_type(cls.name, method.return_type)
-        params = ", ".join(self._param_to_cpp_decl(p) for p in method.params)
+        params, c_args, _ = self._signatures(method)
         const_q = " const" if method.is_const else ""
         
-        lines = [f"{ret} {cls.name}::{method.name}({params}){const_q} {{"]
-        lines.append(f"    if (!handle_) return {ret}();")
+        w.block(
+            f"{self._fn}{ret} {cls.name}::{method.name}({params}){const_q} {{\n"
+            f"    if (!handle_) return {ret}();\n"
+        )
         
-        # Check if we have callback parameters
-        callback_params = [p for p in method.params if self._is_callback_type(p.type)]
-        
-        if callback_params:
-            # Generate wrappers for each callback
-            for p in callback_params:
-                cb = self._get_callback(p.type)
-                cb_params = ", ".join(f"{TypeMapper.to_c(cp.type)} {cp.name}" for cp in cb.params)
-                cb_args = ", ".join(cp.name for cp in cb.params)
-                ret_type = TypeMapper.to_c(cb.return_type)
-                
-                # Store callback in thread_local static, create wrapper
-                lines.append(f"    static thread_local {p.type} s_{p.name};")
-                lines.append(f"    s_{p.name} = {p.name};")
-                lines.append(f"    auto callback_wrapper_{p.name} = []({cb_params}) -> {ret_type} {{")
-                if cb.return_type == 'void':
-                    lines.append(f"        s_{p.name}({cb_args});")
-                else:
-                    lines.append(f"        return s_{p.name}({cb_args});")
-                lines.append("    };")
-        
-        c_args = ", ".join(self._to_c_arg(p) for p in method.params)
-        if c_args:
-            lines.append(f"    return {ret}(g_{prefix}_{method.name}(handle_.get(), {c_args}));")
-        else:
-            lines.append(f"    return {ret}(g_{prefix}_{method.name}(handle_.get()));")
-        lines.append("}")
-        lines.append("")
-        return lines
+        # Callbacks reach the C API through the header's Trampoline, which
+        # converts to the C function pointer type
+        for i, p in enumerate(method.params):
+            if not self._is_callback_type(p.type):
+                continue
+            target = p.name
+            cb = self._callbacks[p.type]
+            # The C side passes struct references as pointers; an adapter dereferences them
+            if any(self._is_struct_ref(cp) for cp in cb.params):
+                target = f"adapt_{p.name}"
+                c_params = ", ".join([f"{self._callback_param_to_c(cp)} a{j}" for j, cp in enumerate(cb.params)])
+                args = ", ".join([f"*a{j}" if self._is_struct_ref(cp) else f"a{j}" for j, cp in enumerate(cb.params)])
+                w.line(f"    auto {target} = [&{p.name}]({c_params}) {{ return {p.name}({args}); }};")
+            w.line(f"    auto callback_wrapper_{p.name} = make_trampoline<::{p.type}, {i}>({target});")
+
+        args = f"handle_.get(), {c_args}" if c_args else "handle_.get()"
+        w.block(
+            f"    return {ret}(g_{prefix}_{method.name}({args}));\n"
+            "}\n"
+            "\n"
+        )
 
     def _is_callback_type(self, type_name: str) -> bool:
         """Check if type is a callback"""
-        return any(cb.name == type_name for cb in self.idl.callbacks)
+        return type_name in self._callbacks
+
+    def _is_struct_ref(self, param: Param) -> bool:
+        return param.is_reference and param.type in self._struct_names
+
+    def _callback_param_to_c(self, param: Param) -> str:
+        """C type of a callback parameter; must match the C API's callback typedefs"""
+        base = TypeMapper.to_c(param.type)
+        if param.is_const:
+            base = f"const {base}"
+        if param.is_pointer or self._is_struct_ref(param):
+            return f"{base}*"
+        return base
 
     def _param_to_cpp_decl(self, param: Param) -> str:
         """Convert param to C++ declaration for method signature"""
@@ -477,25 +709,42 @@ class ClientGenerator:
     def _to_c_arg(self, param: Param, method_name: str = "") -> str:
         if TypeMapper.is_string(param.type):
             return f"{param.name}.c_str()"
-        # Callbacks need a wrapper - the wrapper is generated as a static lambda
+        # Callbacks pass the Trampoline guard emitted by _method_impl
         if self._is_callback_type(param.type):
             return f"callback_wrapper_{param.name}"
         return param.name
 
-    def _get_callback(self, type_name: str) -> Callback:
-        """Get callback definition by name"""
-        return next((cb for cb in self.idl.callbacks if cb.name == type_name), None)
-
-    def _getter_name(self, member: Member) -> str:
-        prefix = "is" if member.type == "bool" else "get"
-        return f"{prefix}{member.name[0].upper()}{member.name[1:]}"
-
-    def _result_struct_name(self, iface_name: str, inner_type: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _pascal_name(name: str) -> str:
+        """Capitalize the first letter, e.g. getTotal -> GetTotal for fn-pointer type names"""
+        return name[:1].upper() + name[1:]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _getter_name(name: str, idl_type: str) -> str:
+        prefix = "is" if idl_type == "bool" else "get"
+        return f"{prefix}{ClientGenerator._pascal_name(name)}"
+
+    def _result_names(self, class_name: str, inner: str) -> "_ResultNames":
+        result_name = self._result_struct_name(class_name, inner)
+        return _ResultNames(
+            inner=inner,
+            result=result_name,
+            c_result=f"::{result_name}",
+            client=self._client_result_name(class_name, inner),
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _result_struct_name(iface_name: str, inner_type: str) -> str:
         """Generate the C API result struct name for interface + element type.
         Must match the C API generator's naming convention."""
         return f"{iface_name}_{inner_type}_CResult"
 
-    def _client_result_name(self, iface_name: str, inner_type: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _client_result_name(iface_name: str, inner_type: str) -> str:
         """Generate the client wrapper result class name for interface + element type"""
         return f"{iface_name}{inner_type}Result"
 
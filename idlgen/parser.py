@@ -16,12 +16,12 @@ class IDLParser:
         return content
 
     def parse(self) -> ParsedIDL:
-        result = ParsedIDL()
-        result.enums = self._parse_enums()
-        result.structs = self._parse_structs()
-        result.callbacks = self._parse_callbacks()
-        result.classes = self._parse_classes()
-        return result
+        return ParsedIDL(
+            enums=self._parse_enums(),
+            structs=self._parse_structs(),
+            callbacks=self._parse_callbacks(),
+            classes=self._parse_classes(),
+        )
 
     def _parse_enums(self) -> list[Enum]:
         """Parse enum declarations like: enum Color { Red, Green = 5, Blue };"""
@@ -77,21 +77,20 @@ class IDLParser:
         pattern = r'class\s+(\w+)\s*\{([^}]*)\}'
         for match in re.finditer(pattern, self.content):
             name, body = match.groups()
-            cls = Class(name=name)
-            self._parse_class_body(body, cls)
-            classes.append(cls)
+            classes.append(Class(name=name, methods=self._parse_class_body(body, name)))
         return classes
 
-    def _parse_class_body(self, body: str, cls: Class):
+    def _parse_class_body(self, body: str, class_name: str) -> list[Method]:
+        methods = []
         for line in body.strip().split(';'):
             line = line.strip()
             if not line:
                 continue
 
             # Check for constructor: ClassName(params)
-            if m := re.match(rf'{cls.name}\s*\(([^)]*)\)', line):
+            if m := re.match(rf'{class_name}\s*\(([^)]*)\)', line):
                 params = self._parse_params(m.group(1))
-                cls.methods.append(Method(
+                methods.append(Method(
                     name="constructor",
                     return_type="void",
                     params=params,
@@ -103,12 +102,13 @@ class IDLParser:
                 method_name = m.group(2)
                 params = self._parse_params(m.group(3))
                 is_const = m.group(4) is not None
-                cls.methods.append(Method(
+                methods.append(Method(
                     name=method_name,
                     return_type=return_type,
                     params=params,
                     is_const=is_const
                 ))
+        return methods
 
     def _parse_params(self, params_str: str) -> list[Param]:
         params = []
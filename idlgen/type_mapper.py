@@ -1,12 +1,19 @@
 """Type mapping from C++-like IDL types to C/C++ types"""
 
 import re
+from functools import lru_cache
 from typing import Optional
 from .types import Param
 
+_VECTOR_RE = re.compile(r'vector<(.+)>')
+
 
 class TypeMapper:
-    """Maps C++-like IDL types to C and C++ types"""
+    """Maps C++-like IDL types to C and C++ types
+
+    The single-type mappings are pure functions of the type string and are
+    memoized, since generators query the same handful of types repeatedly.
+    """
 
     # Direct C++ type mappings
     CPP_TYPES = {
@@ -47,26 +54,29 @@ class TypeMapper:
     }
 
     @classmethod
+    @lru_cache(maxsize=512)
     def to_cpp(cls, idl_type: str) -> str:
         """Convert IDL type to C++ type"""
         # Handle vector<T>
-        if m := re.match(r'vector<(.+)>', idl_type):
+        if m := _VECTOR_RE.match(idl_type):
             inner = m.group(1)
             return f'std::vector<{cls.to_cpp(inner)}>'
         
         return cls.CPP_TYPES.get(idl_type, idl_type)
 
     @classmethod
+    @lru_cache(maxsize=512)
     def to_c(cls, idl_type: str) -> str:
         """Convert IDL type to C type"""
         # Handle vector<T> - returns pointer to first element
-        if m := re.match(r'vector<(.+)>', idl_type):
+        if m := _VECTOR_RE.match(idl_type):
             inner = m.group(1)
             return f'{cls.to_c(inner)}*'
         
         return cls.C_TYPES.get(idl_type, idl_type)
 
     @classmethod
+    @lru_cache(maxsize=512)
     def to_c_param(cls, idl_type: str) -> str:
         """Convert parameter type for C API"""
         if idl_type == 'string':
@@ -111,23 +121,35 @@ class TypeMapper:
             return f'{base_type} {param.name}'
 
     @classmethod
+    @lru_cache(maxsize=512)
     def is_string(cls, idl_type: str) -> bool:
         """Check if type is a string"""
         return idl_type == 'string'
 
     @classmethod
+    @lru_cache(maxsize=512)
     def is_vector(cls, idl_type: str) -> bool:
         """Check if type is a vector"""
         return idl_type.startswith('vector<') and idl_type.endswith('>')
 
     @classmethod
+    @lru_cache(maxsize=512)
     def vector_inner(cls, idl_type: str) -> Optional[str]:
         """Get inner type of vector<T>"""
-        if m := re.match(r'vector<(.+)>', idl_type):
+        if m := _VECTOR_RE.match(idl_type):
             return m.group(1)
         return None
 
     @classmethod
+    @lru_cache(maxsize=512)
+    def parse_vector(cls, idl_type: str) -> tuple[bool, Optional[str]]:
+        """Check for vector<T> and extract T in one step: (is_vector, inner or None)"""
+        if idl_type.startswith('vector<') and idl_type.endswith('>'):
+            return True, idl_type[7:-1]
+        return False, None
+
+    @classmethod
+    @lru_cache(maxsize=512)
     def is_primitive(cls, idl_type: str) -> bool:
         """Check if type is a primitive (not struct/class)"""
         return idl_type in cls.CPP_TYPES or cls.is_vector(idl_type)
@@ -1,9 +1,12 @@
 """Data types for IDL parsing"""
 
-from dataclasses import dataclass, field
+# Slotted: instances are built once by the parser and only read afterwards. Not
+# frozen, since frozen __init__ goes through object.__setattr__ and slows parsing
 
+from dataclasses import dataclass, field, asdict
 
-@dataclass
+
+@dataclass(slots=True)
 class Param:
     """Method parameter"""
     type: str
@@ -12,16 +15,24 @@ class Param:
     is_pointer: bool = False
     is_reference: bool = False
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Param":
+        return cls(**d)
+
 
-@dataclass
+@dataclass(slots=True)
 class Member:
     """Interface or struct member"""
     name: str
     type: str
     is_const: bool = False
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Member":
+        return cls(**d)
+
 
-@dataclass
+@dataclass(slots=True)
 class Method:
     """Interface method"""
     name: str
@@ -30,48 +41,97 @@ class Method:
     is_constructor: bool = False
     is_const: bool = False
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Method":
+        return cls(**{**d, "params": [Param.from_dict(p) for p in d["params"]]})
 
-@dataclass
+
+@dataclass(slots=True)
 class Callback:
     """Callback function type definition"""
     name: str
     return_type: str
     params: list[Param] = field(default_factory=list)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Callback":
+        return cls(**{**d, "params": [Param.from_dict(p) for p in d["params"]]})
+
 
-@dataclass
+@dataclass(slots=True)
 class Class:
     """IDL class definition"""
     name: str
     members: list[Member] = field(default_factory=list)
     methods: list[Method] = field(default_factory=list)
 
+    @property
+    def vector_inners(self) -> tuple[str, ...]:
+        """Unique vector<T> element types returned by methods, in first-use order"""
+        # Imported here: type_mapper imports this module
+        from .type_mapper import TypeMapper
+        vectors = (TypeMapper.parse_vector(m.return_type) for m in self.methods)
+        return tuple(dict.fromkeys(inner for is_vec, inner in vectors if is_vec))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Class":
+        return cls(
+            name=d["name"],
+            members=[Member.from_dict(m) for m in d["members"]],
+            methods=[Method.from_dict(m) for m in d["methods"]],
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class Struct:
     """IDL struct definition"""
     name: str
     members: list[Member] = field(default_factory=list)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Struct":
+        return cls(name=d["name"], members=[Member.from_dict(m) for m in d["members"]])
+
 
-@dataclass
+@dataclass(slots=True)
 class EnumValue:
     """Enum value with optional explicit value"""
     name: str
     value: int | None = None
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "EnumValue":
+        return cls(**d)
+
 
-@dataclass
+@dataclass(slots=True)
 class Enum:
     """IDL enum definition"""
     name: str
     values: list[EnumValue] = field(default_factory=list)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Enum":
+        return cls(name=d["name"], values=[EnumValue.from_dict(v) for v in d["values"]])
 
-@dataclass
+
+@dataclass(slots=True)
 class ParsedIDL:
     """Complete parsed IDL result"""
     enums: list[Enum] = field(default_factory=list)
     structs: list[Struct] = field(default_factory=list)
     classes: list[Class] = field(default_factory=list)
     callbacks: list[Callback] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Convert to plain dicts/lists (JSON-serializable)"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ParsedIDL":
+        return cls(
+            enums=[Enum.from_dict(e) for e in d["enums"]],
+            structs=[Struct.from_dict(s) for s in d["structs"]],
+            classes=[Class.from_dict(c) for c in d["classes"]],
+            callbacks=[Callback.from_dict(cb) for cb in d["callbacks"]],
+        )
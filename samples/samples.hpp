@@ -155,6 +155,10 @@ public:
         }
         return sum;
     }
+
+    [[nodiscard]] int combineTransformed(int value, TransformCallback first, TransformCallback second) {
+        return first(value) * 100 + second(value);
+    }
 };
 
 /**
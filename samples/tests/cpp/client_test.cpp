@@ -0,0 +1,61 @@
+#include <gtest/gtest.h>
+
+#include "samples_client.hpp"
+
+#include <utility>
+#include <vector>
+
+// Defined in client_test_helpers.cpp
+int countImagesWiderThan(int count, int width);
+
+// ============================================================================
+// Header-only client tests (library loaded at runtime)
+// ============================================================================
+
+TEST(ClientTest, Calculator) {
+    samples_client::Calculator calc;
+    
+    EXPECT_EQ(calc.add(2, 3), 5);
+    EXPECT_DOUBLE_EQ(calc.divide(7.0, 2.0), 3.5);
+}
+
+TEST(ClientTest, Callbacks) {
+    samples_client::AsyncProcessor processor;
+    
+    std::vector<std::pair<int, int>> progressCalls;
+    int result = processor.processWithProgress(3, [&](int current, int total) {
+        progressCalls.push_back({current, total});
+    });
+    EXPECT_EQ(result, 3);
+    ASSERT_EQ(progressCalls.size(), 3u);
+    EXPECT_EQ(progressCalls[2].first, 2);
+    
+    int sumSquares = processor.sumTransformed(1, 5, [](int value) {
+        return value * value;
+    });
+    EXPECT_EQ(sumSquares, 55);
+}
+
+TEST(ClientTest, SameTypeCallbacks) {
+    samples_client::AsyncProcessor processor;
+    
+    int combined = processor.combineTransformed(1, [](int value) {
+        return value;
+    }, [](int value) {
+        return value * 2;
+    });
+    EXPECT_EQ(combined, 102);
+}
+
+TEST(ClientTest, StructReferenceCallback) {
+    // processImages passes widths 100..104
+    EXPECT_EQ(countImagesWiderThan(5, 102), 2);
+}
+
+int main(int argc, char** argv) {
+    ::testing::InitGoogleTest(&argc, argv);
+    if (!samples_client::initialize(SAMPLES_CLIENT_LIBRARY)) {
+        return 1;
+    }
+    return RUN_ALL_TESTS();
+}
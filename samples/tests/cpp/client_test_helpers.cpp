@@ -0,0 +1,11 @@
+// Second translation unit including the header-only client, so the test
+// link fails if any of its definitions are not inline
+
+#include "samples_client.hpp"
+
+int countImagesWiderThan(int count, int width) {
+    samples_client::ImageProcessor processor;
+    return processor.processImages(count, [width](ImageData image) {
+        return image.width > width;
+    });
+}
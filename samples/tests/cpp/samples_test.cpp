@@ -227,6 +227,17 @@ TEST(AsyncProcessorTest, SumTransformed) {
     EXPECT_EQ(sumSquares, 55);
 }
 
+TEST(AsyncProcessorTest, CombineTransformed) {
+    samples::AsyncProcessor processor;
+    
+    int combined = processor.combineTransformed(1, [](int value) {
+        return value;
+    }, [](int value) {
+        return value * 2;
+    });
+    EXPECT_EQ(combined, 102);
+}
+
 TEST(AsyncProcessorTest, CAPICallbacks) {
     AsyncProcessorPtr processor(AsyncProcessor_create());
     ASSERT_NE(processor, nullptr);
@@ -250,6 +261,13 @@ TEST(AsyncProcessorTest, CAPICallbacks) {
         return value * 2;
     });
     EXPECT_EQ(sumDoubled, 12);
+    
+    int combined = AsyncProcessor_combineTransformed(processor.get(), 1, [](int value) -> int {
+        return value;
+    }, [](int value) -> int {
+        return value * 2;
+    });
+    EXPECT_EQ(combined, 102);
 }
 
 // ============================================================================